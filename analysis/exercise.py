@@ -1,11 +1,13 @@
 # gymviz/analysis/exercise.py
 # Exercise analysis functions for GymViz
 
+import heapq
 import pandas as pd
 import numpy as np
 import logging
 
 from config.settings import DEBUG
+from data.processor import get_exercise_indices, get_exercise_muscle_groups, get_exercise_rows
 
 # Configure logging
 logging.basicConfig(
@@ -29,11 +31,11 @@ def get_exercise_distribution(df):
         DataFrame with muscle group distribution
     """
     # Group by muscle group
-    distribution = df.groupby('Muscle Group').agg({
-        'Exercise Name': lambda x: len(x.unique()),
+    distribution = df.groupby('Muscle Group', observed=True, sort=False, as_index=False).agg({
+        'Exercise Name': 'nunique',
         'Volume': 'sum',
         '_id': 'count' if '_id' in df.columns else 'size'
-    }).reset_index()
+    })
     
     distribution.columns = ['Muscle Group', 'Exercise Count', 'Volume', 'Set Count']
     
@@ -59,7 +61,7 @@ def analyze_exercise_progression(df, exercise_name):
         Dictionary with progression metrics
     """
     # Filter data for the specified exercise
-    exercise_df = df[df['Exercise Name'] == exercise_name].copy()
+    exercise_df = get_exercise_rows(df, exercise_name, ['Date', 'Weight (kg)', 'Reps', 'Volume', '1RM'])
     
     if exercise_df.empty:
         return None
@@ -68,81 +70,79 @@ def analyze_exercise_progression(df, exercise_name):
     exercise_df = exercise_df.sort_values('Date')
     
     # Group by date to get per-workout data
-    grouped = exercise_df.groupby('Date').agg({
+    grouped = exercise_df.groupby('Date', as_index=False).agg({
         'Weight (kg)': 'max',
         'Reps': 'max',
         'Volume': 'sum',
         '1RM': 'max'
-    }).reset_index()
+    })
+    
+    # Per-workout series as arrays
+    dates = grouped['Date'].to_numpy()
+    weights = grouped['Weight (kg)'].to_numpy()
+    reps = grouped['Reps'].to_numpy()
+    volumes = grouped['Volume'].to_numpy()
+    one_rm = grouped['1RM'].to_numpy()
     
     # Calculate metrics
     result = {
-        'dates': grouped['Date'].tolist(),
-        'weights': grouped['Weight (kg)'].tolist(),
-        'reps': grouped['Reps'].tolist(),
-        'volumes': grouped['Volume'].tolist(),
-        'one_rm': grouped['1RM'].tolist()
+        'dates': dates,
+        'weights': weights,
+        'reps': reps,
+        'volumes': volumes,
+        'one_rm': one_rm
     }
     
     # Calculate performance changes
     if len(grouped) > 1:
         # For first vs last workout
-        first = grouped.iloc[0]
-        last = grouped.iloc[-1]
-        
         result['first_workout'] = {
-            'date': first['Date'],
-            'weight': first['Weight (kg)'],
-            'reps': first['Reps'],
-            'volume': first['Volume'],
-            'one_rm': first['1RM']
+            'date': pd.Timestamp(dates[0]),
+            'weight': weights[0],
+            'reps': reps[0],
+            'volume': volumes[0],
+            'one_rm': one_rm[0]
         }
         
         result['last_workout'] = {
-            'date': last['Date'],
-            'weight': last['Weight (kg)'],
-            'reps': last['Reps'],
-            'volume': last['Volume'],
-            'one_rm': last['1RM']
+            'date': pd.Timestamp(dates[-1]),
+            'weight': weights[-1],
+            'reps': reps[-1],
+            'volume': volumes[-1],
+            'one_rm': one_rm[-1]
         }
         
         # Calculate percent changes
-        if first['Weight (kg)'] > 0:
-            result['weight_change_pct'] = ((last['Weight (kg)'] - first['Weight (kg)']) / first['Weight (kg)']) * 100
+        if weights[0] > 0:
+            result['weight_change_pct'] = ((weights[-1] - weights[0]) / weights[0]) * 100
         else:
             result['weight_change_pct'] = 0
-            
-        if first['Reps'] > 0:
-            result['reps_change_pct'] = ((last['Reps'] - first['Reps']) / first['Reps']) * 100
+        
+        if reps[0] > 0:
+            result['reps_change_pct'] = ((reps[-1] - reps[0]) / reps[0]) * 100
         else:
             result['reps_change_pct'] = 0
-            
-        if first['Volume'] > 0:
-            result['volume_change_pct'] = ((last['Volume'] - first['Volume']) / first['Volume']) * 100
+        
+        if volumes[0] > 0:
+            result['volume_change_pct'] = ((volumes[-1] - volumes[0]) / volumes[0]) * 100
         else:
             result['volume_change_pct'] = 0
-            
-        if first['1RM'] > 0:
-            result['one_rm_change_pct'] = ((last['1RM'] - first['1RM']) / first['1RM']) * 100
+        
+        if one_rm[0] > 0:
+            result['one_rm_change_pct'] = ((one_rm[-1] - one_rm[0]) / one_rm[0]) * 100
         else:
             result['one_rm_change_pct'] = 0
         
         # Calculate average change per workout
         workout_count = len(grouped)
-        result['avg_weight_change_per_workout'] = (last['Weight (kg)'] - first['Weight (kg)']) / (workout_count - 1) if workout_count > 1 else 0
-        result['avg_volume_change_per_workout'] = (last['Volume'] - first['Volume']) / (workout_count - 1) if workout_count > 1 else 0
-    
-    # Calculate personal records
-    result['weight_pr'] = grouped['Weight (kg)'].max()
-    result['reps_pr'] = grouped['Reps'].max()
-    result['volume_pr'] = grouped['Volume'].max()
-    result['one_rm_pr'] = grouped['1RM'].max()
+        result['avg_weight_change_per_workout'] = (weights[-1] - weights[0]) / (workout_count - 1) if workout_count > 1 else 0
+        result['avg_volume_change_per_workout'] = (volumes[-1] - volumes[0]) / (workout_count - 1) if workout_count > 1 else 0
     
-    # Get date of each PR
-    result['weight_pr_date'] = grouped.loc[grouped['Weight (kg)'].idxmax(), 'Date']
-    result['reps_pr_date'] = grouped.loc[grouped['Reps'].idxmax(), 'Date']
-    result['volume_pr_date'] = grouped.loc[grouped['Volume'].idxmax(), 'Date']
-    result['one_rm_pr_date'] = grouped.loc[grouped['1RM'].idxmax(), 'Date']
+    # Calculate personal records and their dates; one argmax per metric gives both
+    for key, values in (('weight', weights), ('reps', reps), ('volume', volumes), ('one_rm', one_rm)):
+        position = np.nanargmax(values)
+        result[f'{key}_pr'] = values[position]
+        result[f'{key}_pr_date'] = pd.Timestamp(dates[position])
     
     # Detect plateaus
     result['plateaus'] = detect_plateaus(exercise_df)
@@ -166,10 +166,10 @@ def detect_plateaus(exercise_df, window=3):
         List of plateau periods
     """
     # Group by date to get per-workout data
-    grouped = exercise_df.groupby('Date').agg({
+    grouped = exercise_df.groupby('Date', as_index=False).agg({
         'Weight (kg)': 'max',
         'Volume': 'sum'
-    }).reset_index()
+    })
     
     # Initialize plateaus list
     plateaus = []
@@ -238,18 +238,24 @@ def find_most_improved_exercises(df, top_n=5, min_occurrences=3):
     exercise_counts = df['Exercise Name'].value_counts()
     frequent_exercises = exercise_counts[exercise_counts >= min_occurrences].index
     
+    # Muscle group of every exercise, looked up once
+    muscle_groups = get_exercise_muscle_groups(df)
+    
+    # Row positions of every exercise, grouped once for the loop below
+    exercise_indices = get_exercise_indices(df)
+    
     # Calculate improvement for each frequent exercise
     improvements = []
     
     for exercise in frequent_exercises:
-        exercise_df = df[df['Exercise Name'] == exercise].copy()
+        exercise_df = get_exercise_rows(df, exercise, ['Date', 'Weight (kg)', 'Volume', '1RM'], exercise_indices)
         
         # Group by date
-        grouped = exercise_df.groupby('Date').agg({
+        grouped = exercise_df.groupby('Date', as_index=False).agg({
             'Weight (kg)': 'max',
             'Volume': 'sum',
             '1RM': 'max'
-        }).reset_index()
+        })
         
         if len(grouped) < 2:
             continue
@@ -263,12 +269,12 @@ def find_most_improved_exercises(df, top_n=5, min_occurrences=3):
             weight_change = ((last_values['Weight (kg)'] - first_values['Weight (kg)']) / first_values['Weight (kg)']) * 100
         else:
             weight_change = 0
-            
+        
         if first_values['Volume'] > 0:
             volume_change = ((last_values['Volume'] - first_values['Volume']) / first_values['Volume']) * 100
         else:
             volume_change = 0
-            
+        
         if first_values['1RM'] > 0:
             one_rm_change = ((last_values['1RM'] - first_values['1RM']) / first_values['1RM']) * 100
         else:
@@ -279,7 +285,7 @@ def find_most_improved_exercises(df, top_n=5, min_occurrences=3):
         
         improvements.append({
             'exercise': exercise,
-            'muscle_group': exercise_df['Muscle Group'].iloc[0],
+            'muscle_group': muscle_groups[exercise],
             'occurrences': len(grouped),
             'weight_change_pct': weight_change,
             'volume_change_pct': volume_change,
@@ -289,7 +295,5 @@ def find_most_improved_exercises(df, top_n=5, min_occurrences=3):
             'last_date': last_values['Date']
         })
     
-    # Sort by overall improvement
-    improvements.sort(key=lambda x: x['overall_improvement'], reverse=True)
-    
-    return improvements[:top_n]
\ No newline at end of file
+    # Keep the top N by overall improvement without sorting the whole list
+    return heapq.nlargest(top_n, improvements, key=lambda x: x['overall_improvement'])
\ No newline at end of file
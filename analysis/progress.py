@@ -6,6 +6,7 @@ import numpy as np
 import logging
 
 from config.settings import DEBUG
+from data.processor import count_personal_records, get_exercise_indices, get_exercise_muscle_groups, get_exercise_rows, get_pr_mask, get_unique_workouts
 
 # Configure logging
 logging.basicConfig(
@@ -31,22 +32,13 @@ def calculate_overall_stats(df):
     stats = {}
     
     # Count PRs if the columns exist
-    pr_columns = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR', 'Is Any PR']
-    available_pr_columns = [col for col in pr_columns if col in df.columns]
-    
-    if 'Is Any PR' in available_pr_columns:
-        stats['pr_count'] = df['Is Any PR'].sum()
-    elif available_pr_columns:
-        # Sum all PR types
-        stats['pr_count'] = df[available_pr_columns].sum().sum()
-    else:
-        stats['pr_count'] = 0
+    stats['pr_count'] = count_personal_records(df)
     
     # Total volume
     stats['total_volume'] = df['Volume'].sum()
     
     # Total workouts
-    unique_workouts = df[['Date', 'Workout Name']].drop_duplicates()
+    unique_workouts = get_unique_workouts(df)
     stats['total_workouts'] = len(unique_workouts)
     
     # Total exercises
@@ -117,7 +109,7 @@ def calculate_overall_stats(df):
     # Average workout duration if available
     if 'Duration (sec)' in df.columns and not df['Duration (sec)'].isna().all():
         # Get average workout duration in seconds
-        unique_workouts = df.drop_duplicates(subset=['Date', 'Workout Name'])
+        unique_workouts = get_unique_workouts(df)
         if not unique_workouts.empty:
             stats['avg_workout_duration'] = unique_workouts['Duration (sec)'].mean()
     
@@ -139,12 +131,18 @@ def _calculate_exercise_improvements(df):
     """
     improvements = []
     
+    # Muscle group of every exercise, looked up once
+    muscle_groups = get_exercise_muscle_groups(df) if 'Muscle Group' in df.columns else {}
+    
+    # Row positions of every exercise, grouped once for the loop below
+    exercise_indices = get_exercise_indices(df)
+    
     # Get exercises that appear at least twice
-    exercise_counts = df.groupby('Exercise Name').size()
+    exercise_counts = df.groupby('Exercise Name', observed=True).size()
     valid_exercises = exercise_counts[exercise_counts >= 2].index
     
     for exercise in valid_exercises:
-        exercise_df = df[df['Exercise Name'] == exercise].copy()
+        exercise_df = get_exercise_rows(df, exercise, ['Date', 'Weight (kg)', '1RM'], exercise_indices)
         
         # Sort by date
         exercise_df = exercise_df.sort_values('Date')
@@ -173,7 +171,7 @@ def _calculate_exercise_improvements(df):
             'improvement': overall_improvement,
             'weight_improvement': weight_improvement,
             'orm_improvement': orm_improvement,
-            'muscle_group': exercise_df['Muscle Group'].iloc[0] if 'Muscle Group' in exercise_df.columns else 'Unknown'
+            'muscle_group': muscle_groups.get(exercise, 'Unknown')
         })
     
     # Sort by overall improvement
@@ -199,57 +197,40 @@ def _find_best_pr(df):
     if 'Is Weight PR' not in df.columns and 'Is 1RM PR' not in df.columns:
         return None
     
-    # Find weight PRs
-    weight_prs = df[df['Is Weight PR'] == True] if 'Is Weight PR' in df.columns else pd.DataFrame()
-    
-    # Find 1RM PRs
-    orm_prs = df[df['Is 1RM PR'] == True] if 'Is 1RM PR' in df.columns else pd.DataFrame()
-    
-    # Combine PRs and find the best one (highest relative to average)
+    # Find the PR with the highest value relative to its exercise average,
+    # checking weight PRs before 1RM PRs (a later type must beat the ratio)
     best_pr = None
     best_ratio = 0
     
-    if not weight_prs.empty:
-        for _, row in weight_prs.iterrows():
-            exercise = row['Exercise Name']
-            weight = row['Weight (kg)']
-            
-            # Get average weight for this exercise
-            avg_weight = df[df['Exercise Name'] == exercise]['Weight (kg)'].mean()
-            
-            if avg_weight > 0:
-                ratio = weight / avg_weight
-                
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_pr = {
-                        'exercise': exercise,
-                        'value': weight,
-                        'type': 'Weight',
-                        'date': row['Date'],
-                        'ratio': ratio
-                    }
-    
-    if not orm_prs.empty:
-        for _, row in orm_prs.iterrows():
-            exercise = row['Exercise Name']
-            orm = row['1RM']
-            
-            # Get average 1RM for this exercise
-            avg_orm = df[df['Exercise Name'] == exercise]['1RM'].mean()
-            
-            if avg_orm > 0:
-                ratio = orm / avg_orm
-                
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_pr = {
-                        'exercise': exercise,
-                        'value': orm,
-                        'type': '1RM',
-                        'date': row['Date'],
-                        'ratio': ratio
-                    }
+    for pr_col, value_col, pr_type in (('Is Weight PR', 'Weight (kg)', 'Weight'), ('Is 1RM PR', '1RM', '1RM')):
+        if pr_col not in df.columns:
+            continue
+        
+        is_pr = (df[pr_col] == True).to_numpy()
+        if not is_pr.any():
+            continue
+        
+        # Average value of each row's exercise, from one grouped pass
+        values = df[value_col].to_numpy(dtype=float)
+        averages = df.groupby('Exercise Name', observed=True, sort=False)[value_col].transform('mean').to_numpy()
+        
+        # Ratio of each PR to its exercise average (0 where there is none)
+        valid = is_pr & (averages > 0)
+        ratios = np.zeros(len(df))
+        ratios[valid] = values[valid] / averages[valid]
+        ratios = np.nan_to_num(ratios, nan=0.0)
+        
+        # First PR with the highest ratio
+        position = int(ratios.argmax())
+        if ratios[position] > best_ratio:
+            best_ratio = ratios[position]
+            best_pr = {
+                'exercise': df['Exercise Name'].iloc[position],
+                'value': float(values[position]),
+                'type': pr_type,
+                'date': df['Date'].iloc[position],
+                'ratio': ratios[position]
+            }
     
     return best_pr
 
@@ -278,7 +259,7 @@ def analyze_volume_progression(df, period='month'):
         period_col = 'YearMonth'
     
     # Group by period
-    volume_by_period = df.groupby(period_col)['Volume'].sum().reset_index()
+    volume_by_period = df.groupby(period_col, as_index=False)['Volume'].sum()
     
     # Calculate cumulative volume
     volume_by_period['Cumulative Volume'] = volume_by_period['Volume'].cumsum()
@@ -311,10 +292,9 @@ def analyze_pr_frequency(df, period='month'):
         DataFrame with PR frequency
     """
     # Check if PR columns exist
-    pr_columns = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR', 'Is Any PR']
-    available_pr_columns = [col for col in pr_columns if col in df.columns]
+    pr_mask = get_pr_mask(df)
     
-    if not available_pr_columns:
+    if pr_mask is None:
         return None
     
     # Define the period column
@@ -325,15 +305,8 @@ def analyze_pr_frequency(df, period='month'):
     else:  # Default to month
         period_col = 'YearMonth'
     
-    # Create PR DataFrame
-    pr_df = df.copy()
-    
-    # If 'Is Any PR' doesn't exist but other PR columns do, create it
-    if 'Is Any PR' not in available_pr_columns and available_pr_columns:
-        pr_df['Is Any PR'] = pr_df[available_pr_columns].any(axis=1)
-    
-    # Group by period and count PRs
-    pr_counts = pr_df.groupby(period_col)['Is Any PR'].sum().reset_index()
+    # Group the PR mask by period and count PRs
+    pr_counts = pr_mask.groupby(df[period_col]).sum().reset_index()
     pr_counts.columns = [period_col, 'PR Count']
     
     # Calculate cumulative PR count
@@ -343,7 +316,7 @@ def analyze_pr_frequency(df, period='month'):
     pr_counts['Rolling Average'] = pr_counts['PR Count'].rolling(window=3, min_periods=1).mean()
     
     # Calculate PRs per workout
-    workout_counts = pr_df.groupby(period_col)['Workout Name'].nunique().reset_index()
+    workout_counts = df.groupby(period_col, as_index=False)['Workout Name'].nunique()
     workout_counts.columns = [period_col, 'Workout Count']
     
     # Merge PR counts with workout counts
@@ -382,10 +355,10 @@ def analyze_strength_progression(df, period='month'):
         period_col = 'YearMonth'
     
     # Calculate average weight and 1RM by period
-    strength_by_period = df.groupby(period_col).agg({
+    strength_by_period = df.groupby(period_col, as_index=False).agg({
         'Weight (kg)': 'mean',
         '1RM': 'mean'
-    }).reset_index()
+    })
     
     # Calculate rolling averages (3-period)
     strength_by_period['Weight Rolling Avg'] = strength_by_period['Weight (kg)'].rolling(window=3, min_periods=1).mean()
@@ -403,12 +376,12 @@ def analyze_strength_progression(df, period='month'):
     muscle_strength = {}
     
     if 'Muscle Group' in df.columns:
-        for muscle_group, muscle_df in df.groupby('Muscle Group'):
+        for muscle_group, muscle_df in df.groupby('Muscle Group', observed=True, sort=False):
             # Calculate average weight and 1RM by period
-            muscle_strength_by_period = muscle_df.groupby(period_col).agg({
+            muscle_strength_by_period = muscle_df.groupby(period_col, as_index=False).agg({
                 'Weight (kg)': 'mean',
                 '1RM': 'mean'
-            }).reset_index()
+            })
             
             # Calculate percent changes from first to last period
             if len(muscle_strength_by_period) > 1:
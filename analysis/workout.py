@@ -3,6 +3,11 @@
 
 import datetime as dt
 
+import numpy as np
+
+from config.settings import WEEKDAY_NAMES
+from utils.date_utils import find_streaks, unique_days
+
 def get_default_date_range(min_date, max_date):
     """
     Get a default date range for filtering
@@ -112,8 +117,8 @@ def analyze_workout_patterns(df):
     dict
         Dictionary with workout pattern metrics
     """
-    # Get unique workout dates
-    workout_dates = df['Date'].dt.date.unique()
+    # Get unique workout dates (sorted datetime64[D])
+    workout_dates = unique_days(df['Date'])
     
     # Calculate metrics
     total_workouts = len(workout_dates)
@@ -127,9 +132,9 @@ def analyze_workout_patterns(df):
         }
     
     # Date range
-    min_date = min(workout_dates)
-    max_date = max(workout_dates)
-    date_range_days = (max_date - min_date).days + 1
+    min_date = workout_dates[0]
+    max_date = workout_dates[-1]
+    date_range_days = int((max_date - min_date).astype('int64')) + 1
     
     # Weeks in the dataset
     weeks = date_range_days / 7
@@ -137,27 +142,13 @@ def analyze_workout_patterns(df):
     # Average workouts per week
     avg_weekly_workouts = total_workouts / weeks if weeks > 0 else 0
     
-    # Most common day of week
-    day_counts = df['Date'].dt.day_name().value_counts()
-    most_common_day = day_counts.index[0] if not day_counts.empty else None
+    # Most common day of week (sets counted per weekday number, Monday = 0)
+    day_counts = np.bincount(df['Date'].dt.dayofweek.dropna().to_numpy(dtype=np.int64), minlength=7)
+    most_common_day = WEEKDAY_NAMES[int(day_counts.argmax())]
     
     # Calculate streaks
-    dates = sorted(workout_dates)
-    streaks = []
-    current_streak = [dates[0]]
-    
-    for i in range(1, len(dates)):
-        if (dates[i] - dates[i-1]).days == 1:
-            current_streak.append(dates[i])
-        else:
-            if len(current_streak) > 1:
-                streaks.append(current_streak)
-            current_streak = [dates[i]]
-    
-    if len(current_streak) > 1:
-        streaks.append(current_streak)
-    
-    longest_streak = max(len(streak) for streak in streaks) if streaks else 0
+    _, _, streak_lengths = find_streaks(df['Date'])
+    longest_streak = int(streak_lengths.max()) if len(streak_lengths) else 0
     
     return {
         'total_workouts': total_workouts,
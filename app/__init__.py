@@ -1,6 +1,11 @@
 # gym_monitoring/app/__init__.py
 # Initialize the app package
 
-# Import subpackages to make them available
-from . import pages
-from . import components
\ No newline at end of file
+import importlib
+
+# Subpackages are imported on first access (app.pages, app.components), so
+# loading one component does not pull in every page and plotly with it
+def __getattr__(name):
+    if name in ('pages', 'components'):
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
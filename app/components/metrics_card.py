@@ -72,23 +72,21 @@ def metric_card(label, value, delta=None, suffix="", help_text=None, color=None,
     # Add icon if provided
     icon_html = f'<span class="metric-icon">{icon}</span> ' if icon else ''
     
-    # Create a container with custom styling
-    with st.container():
-        # Apply metric card styling with animation
-        st.markdown(
-            f"""
-            <div class="metric-card slide-in">
-                <div class="metric-value" style="color: {color};">{icon_html}{formatted_value}{suffix}</div>
-                <div class="metric-label">{label}</div>
-                {delta_html}
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        
-        # Add help tooltip if provided
-        if help_text:
-            st.markdown(f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>", unsafe_allow_html=True)
+    # Add help tooltip if provided
+    help_html = ''
+    if help_text:
+        help_html = f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>"
+    
+    # Emit the card and its help text as a single element
+    st.markdown(
+        f'<div class="metric-card slide-in">'
+        f'<div class="metric-value" style="color: {color};">{icon_html}{formatted_value}{suffix}</div>'
+        f'<div class="metric-label">{label}</div>'
+        f'{delta_html}'
+        f'</div>'
+        f'{help_html}',
+        unsafe_allow_html=True
+    )
 
 def metric_row(metrics, columns=None):
     """
@@ -162,28 +160,29 @@ def progress_metric(label, current_value, target_value, suffix="", help_text=Non
     else:
         target_formatted = str(target_value)
     
-    # Create metric with progress bar
-    with st.container():
-        st.markdown(
-            f"""
-            <div class="metric-card slide-in">
-                <div class="metric-value">{current_formatted}{suffix} <span style="font-size: 0.7em; color: {THEME["text"]["secondary"]}">/ {target_formatted}{suffix}</span></div>
-                <div class="metric-label">{label}</div>
-                <div class="progress-container">
-                    <div class="progress-bar" style="width: {progress_pct}%;"></div>
-                </div>
-                <div style="display: flex; justify-content: space-between; font-size: 0.8em; color: {THEME["text"]["secondary"]}; margin-top: 5px;">
-                    <div>0</div>
-                    <div>{target_value}{suffix}</div>
-                </div>
+    # Add help tooltip if provided
+    help_html = ''
+    if help_text:
+        help_html = f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>"
+    
+    # Emit the card, progress bar and help text as a single element
+    st.markdown(
+        f"""
+        <div class="metric-card slide-in">
+            <div class="metric-value">{current_formatted}{suffix} <span style="font-size: 0.7em; color: {THEME["text"]["secondary"]}">/ {target_formatted}{suffix}</span></div>
+            <div class="metric-label">{label}</div>
+            <div class="progress-container">
+                <div class="progress-bar" style="width: {progress_pct}%;"></div>
             </div>
-            """,
-            unsafe_allow_html=True
-        )
-        
-        # Add help tooltip if provided
-        if help_text:
-            st.markdown(f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>", unsafe_allow_html=True)
+            <div style="display: flex; justify-content: space-between; font-size: 0.8em; color: {THEME["text"]["secondary"]}; margin-top: 5px;">
+                <div>0</div>
+                <div>{target_value}{suffix}</div>
+            </div>
+        </div>
+        {help_html}
+        """,
+        unsafe_allow_html=True
+    )
 
 def comparison_metric(label, value1, value2, label1="Current", label2="Previous", suffix="", help_text=None):
     """
@@ -234,33 +233,34 @@ def comparison_metric(label, value1, value2, label1="Current", label2="Previous"
     else:
         value2_formatted = str(value2)
     
-    # Create comparison metric card
-    with st.container():
-        st.markdown(
-            f"""
-            <div class="metric-card slide-in">
-                <div class="metric-label">{label}</div>
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 10px;">
-                    <div>
-                        <div class="metric-value">{value1_formatted}{suffix}</div>
-                        <div style="font-size: 0.8em; color: {THEME["text"]["secondary"]};">{label1}</div>
-                    </div>
-                    <div style="color: {change_color}; font-size: 1.2em; font-weight: bold;">
-                        {change_icon} {abs(percent_change):.1f}%
-                    </div>
-                    <div>
-                        <div style="font-size: 1.2em; color: {THEME["text"]["secondary"]};">{value2_formatted}{suffix}</div>
-                        <div style="font-size: 0.8em; color: {THEME["text"]["secondary"]};">{label2}</div>
-                    </div>
+    # Add help tooltip if provided
+    help_html = ''
+    if help_text:
+        help_html = f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>"
+    
+    # Emit the comparison card and help text as a single element
+    st.markdown(
+        f"""
+        <div class="metric-card slide-in">
+            <div class="metric-label">{label}</div>
+            <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 10px;">
+                <div>
+                    <div class="metric-value">{value1_formatted}{suffix}</div>
+                    <div style="font-size: 0.8em; color: {THEME["text"]["secondary"]};">{label1}</div>
+                </div>
+                <div style="color: {change_color}; font-size: 1.2em; font-weight: bold;">
+                    {change_icon} {abs(percent_change):.1f}%
+                </div>
+                <div>
+                    <div style="font-size: 1.2em; color: {THEME["text"]["secondary"]};">{value2_formatted}{suffix}</div>
+                    <div style="font-size: 0.8em; color: {THEME["text"]["secondary"]};">{label2}</div>
                 </div>
             </div>
-            """,
-            unsafe_allow_html=True
-        )
-        
-        # Add help tooltip if provided
-        if help_text:
-            st.markdown(f"<div style='text-align:center; color: {THEME['text']['secondary']}'><small>{help_text}</small></div>", unsafe_allow_html=True)
+        </div>
+        {help_html}
+        """,
+        unsafe_allow_html=True
+    )
 
 def get_system_stats_cards():
     """
@@ -3,6 +3,7 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime as dt
 import os
 import sys
@@ -15,6 +16,28 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+from config.settings import CSV_SETTINGS, CSV_BLOCK_SIZE, CSV_CHUNK_SIZE, CSV_CHUNK_THRESHOLD, CACHE_TTL
+from data.cache import read_sidecar, write_sidecar
+from data.parser import downcast_numeric_columns, parse_workout_dates
+from data.processor import get_unique_workouts
+from utils.date_utils import day_range_mask
+
+# pyarrow is optional - without it the default pandas CSV engine is used
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Strong columns always read as text, so empty notes and 'W'/'D' set
+# markers give the same dtype whichever reader is used
+CSV_TEXT_COLUMNS = ['Workout Name', 'Exercise Name', 'Set Order', 'Notes', 'Workout Notes']
+
+# Strong columns read as numbers; typed up front so a chunked read does not
+# depend on what its first block happens to contain
+CSV_NUMERIC_COLUMNS = ['Weight (kg)', 'Reps', 'RPE', 'Distance (meters)', 'Seconds', 'Duration (sec)']
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,54 +72,258 @@ def get_default_date_range(min_date, max_date):
     
     return default_start, max_date
 
-def parse_strong_csv(file_path):
+def _get_file_size(file_path):
     """
-    Parse a CSV export from Strong app
+    Get the size in bytes of a CSV path or uploaded file, if known
     
     Parameters:
     -----------
     file_path : str or file-like object
         Path to the CSV file or uploaded file object
+        
+    Returns:
+    --------
+    int or None
+        File size in bytes, or None if it cannot be determined
+    """
+    if isinstance(file_path, (str, os.PathLike)):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+    
+    # Streamlit's UploadedFile exposes its size directly
+    return getattr(file_path, 'size', None)
+
+def _arrow_csv_options():
+    """
+    Build the pyarrow reader options for a Strong CSV export
+    
+    Shared by the whole-file and chunked readers so both type every
+    column the same way.
     
+    Returns:
+    --------
+    dict
+        read_options, parse_options and convert_options keyword arguments
+    """
+    column_types = {col: pa.string() for col in CSV_TEXT_COLUMNS}
+    column_types.update({col: pa.float64() for col in CSV_NUMERIC_COLUMNS})
+    
+    return {
+        'read_options': pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+        'parse_options': pa_csv.ParseOptions(delimiter=CSV_SETTINGS['separator']),
+        'convert_options': pa_csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True,
+            timestamp_parsers=[CSV_SETTINGS['datetime_format'], pa_csv.ISO8601]
+        )
+    }
+
+def _arrow_to_pandas(table):
+    """
+    Convert an Arrow table of raw CSV rows to a DataFrame
+    
+    Columns are converted one by one, releasing the Arrow buffers as we go;
+    Date comes back as datetime64[ns] like the pandas readers produce.
+    
+    Parameters:
+    -----------
+    table : pyarrow.Table
+        Rows read with _arrow_csv_options
+        
     Returns:
     --------
     pandas.DataFrame
-        Parsed DataFrame
+        Raw rows as read from the CSV
     """
-    try:
-        # Read CSV file
-        df = pd.read_csv(file_path, sep=';')
+    return table.to_pandas(split_blocks=True, self_destruct=True, coerce_temporal_nanoseconds=True)
+
+def _read_csv(file_path):
+    """
+    Read a whole Strong CSV export into a DataFrame
+    
+    Uses pyarrow's multithreaded reader when available, which also parses
+    the Date column as a timestamp while reading; falls back to the default
+    C engine.
+    
+    Parameters:
+    -----------
+    file_path : str or file-like object
+        Path to the CSV file or uploaded file object
         
-        # Clean column names by removing quotes if they exist
-        df.columns = [col.replace('"', '') for col in df.columns]
+    Returns:
+    --------
+    pandas.DataFrame
+        Raw rows as read from the CSV
+    """
+    if not PYARROW_AVAILABLE:
+        logger.debug("pyarrow not available, using the default CSV engine")
+        return pd.read_csv(
+            file_path,
+            sep=CSV_SETTINGS['separator'],
+            dtype={col: str for col in CSV_TEXT_COLUMNS}
+        )
+    
+    # Parse in parallel blocks, typing Date with Strong's timestamp format
+    return _arrow_to_pandas(pa_csv.read_csv(file_path, **_arrow_csv_options()))
+
+def _iter_csv_chunks(file_path):
+    """
+    Read a Strong CSV export in DataFrames of about CSV_CHUNK_SIZE rows
+    
+    Uses pyarrow's streaming reader with the same options as _read_csv, so
+    chunked and whole-file reads give the same dtypes; falls back to the
+    default C engine.
+    
+    Parameters:
+    -----------
+    file_path : str or file-like object
+        Path to the CSV file or uploaded file object
         
-        # Convert date column to datetime
-        df['Date'] = pd.to_datetime(df['Date'])
+    Yields:
+    -------
+    pandas.DataFrame
+        Consecutive blocks of raw rows
+    """
+    if not PYARROW_AVAILABLE:
+        logger.debug("pyarrow not available, using the default CSV engine")
+        yield from pd.read_csv(
+            file_path,
+            sep=CSV_SETTINGS['separator'],
+            dtype={col: str for col in CSV_TEXT_COLUMNS},
+            chunksize=CSV_CHUNK_SIZE
+        )
+        return
+    
+    reader = pa_csv.open_csv(file_path, **_arrow_csv_options())
+    
+    # Collect record batches until a chunk's worth of rows is buffered
+    batches = []
+    buffered_rows = 0
+    emitted = False
+    
+    for batch in reader:
+        batches.append(batch)
+        buffered_rows += batch.num_rows
         
-        # Convert numeric columns
-        numeric_columns = ['Weight (kg)', 'Reps', 'RPE', 'Distance (meters)', 'Seconds', 'Duration (sec)']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                df[col] = df[col].fillna(0)
+        if buffered_rows >= CSV_CHUNK_SIZE:
+            yield _arrow_to_pandas(pa.Table.from_batches(batches, schema=reader.schema))
+            batches = []
+            buffered_rows = 0
+            emitted = True
+    
+    # Emit the remainder (an empty frame keeps the columns of an empty file)
+    if batches or not emitted:
+        yield _arrow_to_pandas(pa.Table.from_batches(batches, schema=reader.schema))
+
+def _clean_csv_chunk(df):
+    """
+    Clean a block of raw Strong CSV rows
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Raw rows as read from the CSV
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Rows with parsed dates, numeric columns and volume
+    """
+    # Clean column names by removing quotes if they exist
+    df.columns = [col.replace('"', '') for col in df.columns]
+    
+    # Convert date column to datetime (already typed when read with pyarrow)
+    if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = parse_workout_dates(df['Date'])
+    
+    # Convert numeric columns
+    for col in CSV_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = df[col].fillna(0)
+    
+    # Narrow the numeric columns, then calculate volume (weight × reps) in float32
+    downcast_numeric_columns(df)
+    df['Volume'] = df['Weight (kg)'].to_numpy(np.float32) * df['Reps'].to_numpy(np.float32)
+    
+    # Convert Set Order to numeric if it's not already
+    if 'Set Order' in df.columns:
+        df['Set Order'] = pd.to_numeric(df['Set Order'], errors='coerce')
+    
+    return df
+
+def parse_strong_csv(file_path):
+    """
+    Parse a CSV export from Strong app
+    
+    Large files (above CSV_CHUNK_THRESHOLD bytes) are read and cleaned in
+    blocks of CSV_CHUNK_SIZE rows so peak memory stays bounded. Files on disk
+    get an Arrow sidecar that is reused while it is newer than the CSV.
+    
+    Parameters:
+    -----------
+    file_path : str or file-like object
+        Path to the CSV file or uploaded file object
         
-        # Calculate volume (weight × reps)
-        df['Volume'] = df['Weight (kg)'] * df['Reps']
+    Returns:
+    --------
+    pandas.DataFrame
+        Parsed DataFrame
+    """
+    try:
+        # Reuse the Arrow sidecar for files on disk when it is up to date
+        if isinstance(file_path, str):
+            cached = read_sidecar(file_path)
+            if cached is not None:
+                return cached
         
-        # Convert Set Order to numeric if it's not already
-        if 'Set Order' in df.columns:
-            df['Set Order'] = pd.to_numeric(df['Set Order'], errors='coerce')
+        file_size = _get_file_size(file_path)
+        
+        if file_size is not None and file_size > CSV_CHUNK_THRESHOLD:
+            # Read and clean the CSV chunk by chunk
+            logger.info(f"Reading large CSV ({file_size / 1024 / 1024:.1f} MB) in chunks of {CSV_CHUNK_SIZE} rows")
+            chunks = [_clean_csv_chunk(chunk) for chunk in _iter_csv_chunks(file_path)]
+            df = pd.concat(chunks, ignore_index=True)
+        else:
+            # Read CSV file
+            df = _clean_csv_chunk(_read_csv(file_path))
         
         # Add an ID column
         df['_id'] = range(1, len(df) + 1)
         
         logger.info(f"Successfully parsed CSV: {len(df)} rows, {df['Exercise Name'].nunique()} unique exercises")
-        return df
         
+        if isinstance(file_path, str):
+            write_sidecar(file_path, df)
+        
+        return df
+    
     except Exception as e:
         logger.error(f"Error parsing CSV: {str(e)}")
         raise ValueError(f"Failed to parse CSV file: {str(e)}")
 
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def load_strong_csv(file_path, mtime=None):
+    """
+    Parse a Strong CSV export once and reuse the result across reruns
+    
+    Parameters:
+    -----------
+    file_path : str or file-like object
+        Path to the CSV file or uploaded file object
+    mtime : float, optional
+        Modification time of a CSV on disk; part of the cache key so that
+        an edited file is parsed again instead of served from the cache
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Parsed DataFrame
+    """
+    return parse_strong_csv(file_path)
+
 def check_for_default_csv():
     """
     Check if strong.csv exists in the root directory
@@ -159,7 +386,7 @@ def render_sidebar():
             with st.spinner("Processing data..."):
                 try:
                     # Parse the uploaded file
-                    data = parse_strong_csv(uploaded_file)
+                    data = load_strong_csv(uploaded_file)
                     st.sidebar.success("Data loaded successfully!")
                 except Exception as e:
                     st.sidebar.error(f"Error loading data: {str(e)}")
@@ -168,7 +395,7 @@ def render_sidebar():
         with st.spinner("Loading default data..."):
             try:
                 # Parse the default CSV file
-                data = parse_strong_csv(default_csv_path)
+                data = load_strong_csv(default_csv_path, os.path.getmtime(default_csv_path))
                 st.sidebar.success(f"Default data loaded from {os.path.basename(default_csv_path)}!")
             except Exception as e:
                 st.sidebar.error(f"Error loading default data: {str(e)}")
@@ -179,7 +406,7 @@ def render_sidebar():
             sample_data_path = os.path.join(project_root, "data", "samples", "strong_sample.csv")
             if os.path.exists(sample_data_path):
                 try:
-                    data = parse_strong_csv(sample_data_path)
+                    data = load_strong_csv(sample_data_path, os.path.getmtime(sample_data_path))
                     st.sidebar.success("Sample data loaded!")
                 except Exception as e:
                     st.sidebar.error(f"Error loading sample data: {str(e)}")
@@ -275,15 +502,17 @@ def render_sidebar():
         st.sidebar.header("Dataset Summary")
         
         # Count unique workouts, exercises, and total sets
-        filtered_data = data[(data['Date'].dt.date >= start_date) & (data['Date'].dt.date <= end_date)]
+        mask = day_range_mask(data['Date'], start_date, end_date)
         
         if 'muscle_groups' in filters and filters['muscle_groups']:
-            filtered_data = filtered_data[filtered_data['Muscle Group'].isin(filters['muscle_groups'])]
+            mask &= data['Muscle Group'].isin(filters['muscle_groups']).to_numpy()
         
         if 'exercises' in filters and filters['exercises']:
-            filtered_data = filtered_data[filtered_data['Exercise Name'].isin(filters['exercises'])]
+            mask &= data['Exercise Name'].isin(filters['exercises']).to_numpy()
+        
+        filtered_data = data[mask]
         
-        unique_workouts = filtered_data[['Date', 'Workout Name']].drop_duplicates()
+        unique_workouts = get_unique_workouts(filtered_data)
         total_workouts = len(unique_workouts)
         total_exercises = filtered_data['Exercise Name'].nunique()
         total_sets = len(filtered_data)
@@ -3,7 +3,9 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+import re
 import sys
 import logging
 
@@ -19,25 +21,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Import components
+# Import components (the dashboard pages, and plotly with them, are imported once data is loaded)
 from app.components.sidebar import render_sidebar
-from app.components.metrics_card import metric_card, metric_row
-
-# Import pages
-from app.pages import (
-    overview,
-    exercise_analysis,
-    muscle_groups,
-    workout_patterns,
-    progress_tracking,
-    records_registry
-)
 
 # Import settings
-from config.settings import APP_TITLE, APP_ICON, APP_LAYOUT, VERSION, THEME
+from config.settings import APP_TITLE, APP_ICON, APP_LAYOUT, VERSION, CACHE_TTL, CATEGORY_COLUMNS, WEEKDAY_NAMES
+from data.parser import parse_workout_dates
+from utils.date_utils import format_dates
 
-def apply_custom_css():
-    """Apply custom CSS to the Streamlit app"""
+# Fallback exercise -> muscle group mapping (substring match, first key wins)
+FALLBACK_MUSCLE_GROUPS = {
+    'Bench Press': 'Chest',
+    'Incline Bench Press': 'Chest',
+    'Chest Dip': 'Chest',
+    'Cable Crossover': 'Chest',
+    'Squat': 'Legs',
+    'Deadlift': 'Back',
+    'Pull Up': 'Back',
+    'Chin Up': 'Back',
+    'Seated Row': 'Back',
+    'Lat Pulldown': 'Back',
+    'Overhead Press': 'Shoulders',
+    'Arnold Press': 'Shoulders',
+    'Lateral Raise': 'Shoulders',
+    'Front Raise': 'Shoulders',
+    'Bicep Curl': 'Arms',
+    'Tricep Extension': 'Arms',
+    'Leg Press': 'Legs',
+    'Leg Extension': 'Legs',
+    'Leg Curl': 'Legs',
+    'Seated Calf Raise': 'Legs',
+    'Hip Thrust': 'Legs',
+    'Lunge': 'Legs',
+    'Plank': 'Core',
+    'Crunch': 'Core',
+    'Sit Up': 'Core',
+    'Ab Wheel': 'Core',
+    'Bicycle Crunch': 'Core',
+    'Running': 'Cardio',
+    'Cycling': 'Cardio'
+}
+
+# Each alternative is anchored at the start so keys keep their dict priority,
+# as with a linear scan over the dict
+FALLBACK_MUSCLE_PATTERN = re.compile(
+    '^(?:' + '|'.join(f'.*?({re.escape(k)})' for k in FALLBACK_MUSCLE_GROUPS) + ')',
+    re.IGNORECASE
+)
+
+@st.cache_resource
+def _load_custom_css():
+    """Read the custom CSS once per server process"""
     # Check if there's a custom CSS file in the assets directory
     css_path = os.path.join(project_root, "visualization", "assets", "css", "style.css")
     
@@ -87,16 +121,31 @@ def apply_custom_css():
         </style>
         """
     
-    st.markdown(css, unsafe_allow_html=True)
+    return css
+
+def apply_custom_css():
+    """Apply custom CSS to the Streamlit app"""
+    st.markdown(_load_custom_css(), unsafe_allow_html=True)
 
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
 def preprocess_data(df):
     """
     Temporary preprocessing function until imports work
     Ensures YearMonth, YearWeek and other required columns are present
+    Cached, so reruns with the same loaded data skip the derivations
+    Rows are returned in Date order so date ranges can be sliced
     """
+    # Add columns to a shallow copy so the caller's frame is left untouched
+    # without copying any column data
+    df = df.copy(deep=False)
+    
     # Convert date column to datetime if it's not already
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
-        df['Date'] = pd.to_datetime(df['Date'])
+        df['Date'] = parse_workout_dates(df['Date'])
+    
+    # Keep rows in date order (stable, so sets within a workout keep their order)
+    if not df['Date'].is_monotonic_increasing:
+        df = df.sort_values('Date', kind='mergesort', ignore_index=True)
     
     # Calculate volume (weight × reps) if not present
     if 'Volume' not in df.columns:
@@ -109,52 +158,31 @@ def preprocess_data(df):
     # Add date-related columns needed for aggregation
     df['Year'] = df['Date'].dt.year
     df['Month'] = df['Date'].dt.month
-    df['MonthName'] = df['Date'].dt.month_name()
+    df['MonthName'] = format_dates(df['Date'], '%B')
     df['Day'] = df['Date'].dt.day
-    df['Weekday'] = df['Date'].dt.day_name()
+    # Weekday as a calendar-ordered categorical built from day-of-week codes
+    df['Weekday'] = pd.Categorical.from_codes(df['Date'].dt.dayofweek, categories=WEEKDAY_NAMES, ordered=True)
     df['Week'] = df['Date'].dt.isocalendar().week
     
     # Format strings for period grouping (fixes KeyError: 'YearMonth' and 'YearWeek')
-    df['YearMonth'] = df['Date'].dt.strftime('%Y-%m')
-    df['YearWeek'] = df['Date'].dt.strftime('%Y-%U')
+    # Formatted once per distinct day here so downstream code can reuse them
+    df['YearMonth'] = format_dates(df['Date'], '%Y-%m')
+    df['YearWeek'] = format_dates(df['Date'], '%Y-%U')
     
     # Add muscle group mapping if not present
     if 'Muscle Group' not in df.columns:
-        muscle_groups = {
-            'Bench Press': 'Chest',
-            'Incline Bench Press': 'Chest',
-            'Chest Dip': 'Chest',
-            'Cable Crossover': 'Chest',
-            'Squat': 'Legs',
-            'Deadlift': 'Back',
-            'Pull Up': 'Back',
-            'Chin Up': 'Back',
-            'Seated Row': 'Back',
-            'Lat Pulldown': 'Back',
-            'Overhead Press': 'Shoulders',
-            'Arnold Press': 'Shoulders',
-            'Lateral Raise': 'Shoulders',
-            'Front Raise': 'Shoulders',
-            'Bicep Curl': 'Arms',
-            'Tricep Extension': 'Arms',
-            'Leg Press': 'Legs',
-            'Leg Extension': 'Legs',
-            'Leg Curl': 'Legs',
-            'Seated Calf Raise': 'Legs',
-            'Hip Thrust': 'Legs',
-            'Lunge': 'Legs',
-            'Plank': 'Core',
-            'Crunch': 'Core',
-            'Sit Up': 'Core',
-            'Ab Wheel': 'Core',
-            'Bicycle Crunch': 'Core',
-            'Running': 'Cardio',
-            'Cycling': 'Cardio'
-        }
+        # One case-insensitive regex scan per distinct name, mapped back to the rows
+        names = pd.Series(df['Exercise Name'].unique())
+        matches = names.str.extract(FALLBACK_MUSCLE_PATTERN)
+        matches.columns = list(FALLBACK_MUSCLE_GROUPS.values())
         
-        df['Muscle Group'] = df['Exercise Name'].apply(
-            lambda x: next((v for k, v in muscle_groups.items() if k.lower() in x.lower()), 'Other')
-        )
+        # Name of the first matching key's muscle group, 'Other' if none matched;
+        # idxmax is only resolved for the names that matched something
+        matched = matches.notna()
+        any_match = matched.any(axis=1).to_numpy()
+        muscle_groups = np.full(len(names), 'Other', dtype=object)
+        muscle_groups[any_match] = matched[any_match].idxmax(axis=1).to_numpy()
+        df['Muscle Group'] = df['Exercise Name'].map(dict(zip(names, muscle_groups)))
     
     # Convert duration to minutes if present
     if 'Duration (sec)' in df.columns:
@@ -162,14 +190,49 @@ def preprocess_data(df):
     
     # Ensure 1RM is calculated if not present
     if '1RM' not in df.columns:
-        # Brzycki formula for 1RM estimation
-        df['1RM'] = df.apply(
-            lambda row: row['Weight (kg)'] * (36 / (37 - row['Reps'])) if row['Reps'] < 37 and row['Weight (kg)'] > 0 else 0,
-            axis=1
-        )
+        # Brzycki formula for 1RM estimation, evaluated only on weighted sets
+        weight = df['Weight (kg)'].to_numpy(dtype=float)
+        reps = df['Reps'].to_numpy(dtype=float)
+        weighted = (weight > 0) & (reps < 37)
+        
+        one_rm = np.zeros(len(df))
+        one_rm[weighted] = weight[weighted] * (36 / (37 - reps[weighted]))
+        df['1RM'] = one_rm
+    
+    # Store the low-cardinality labels as categories (integer codes for groupby/isin)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
     
     return df
 
+# Fragments landed as st.experimental_fragment and were later renamed st.fragment
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+def _render_page(page, data):
+    """
+    Render one dashboard page
+    
+    Runs as a fragment where Streamlit supports it, so a widget on the page
+    (e.g. an exercise selectbox) reruns only that page, not the whole app.
+    
+    Parameters:
+    -----------
+    page : module
+        Page module with a render(data) function
+    data : pandas DataFrame
+        The filtered workout data
+    """
+    try:
+        page.render(data)
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
+        st.error("Please check the logs for more details.")
+        logger.error(f"Error rendering {page.__name__}: {str(e)}", exc_info=True)
+
+if _fragment is not None:
+    _render_page = _fragment(_render_page)
+
 def main():
     """Main function that runs the Streamlit application"""
     
@@ -191,50 +254,62 @@ def main():
     data, filters = render_sidebar()
     
     if data is not None:
+        # Import pages
+        from app.pages import (
+            overview,
+            exercise_analysis,
+            muscle_groups,
+            workout_patterns,
+            progress_tracking,
+            records_registry
+        )
+        
         # Ensure all required columns are present
         data = preprocess_data(data)
         
-        # Create tabs for different dashboard sections
-        tabs = st.tabs([
-            "Overview",
-            "Exercise Analysis",
-            "Muscle Groups",
-            "Workout Patterns",
-            "Progress Tracking",
-            "Records Registry"
-        ])
+        # Choose a dashboard section; unlike st.tabs, only the selected page runs
+        sections = {
+            "Overview": overview,
+            "Exercise Analysis": exercise_analysis,
+            "Muscle Groups": muscle_groups,
+            "Workout Patterns": workout_patterns,
+            "Progress Tracking": progress_tracking,
+            "Records Registry": records_registry
+        }
+        active_section = st.radio(
+            "Section",
+            list(sections),
+            horizontal=True,
+            key='active_tab',
+            label_visibility='collapsed'
+        )
         
-        # Apply date filters
-        filtered_data = data[(data['Date'].dt.date >= filters['start_date']) & 
-                            (data['Date'].dt.date <= filters['end_date'])]
+        # Apply date filters; Date is sorted, so the range is one contiguous slice
+        dates = data['Date'].to_numpy()
+        bounds = np.array(
+            [np.datetime64(filters['start_date']), np.datetime64(filters['end_date']) + np.timedelta64(1, 'D')],
+            dtype=dates.dtype
+        )
+        start, stop = dates.searchsorted(bounds)
+        filtered_data = data.iloc[start:stop]
+        
+        # Combine the muscle group and exercise filters so the rows are copied once
+        mask = np.ones(len(filtered_data), dtype=bool)
         
         # Apply muscle group filter if provided
         if 'muscle_groups' in filters and filters['muscle_groups']:
-            filtered_data = filtered_data[filtered_data['Muscle Group'].isin(filters['muscle_groups'])]
+            mask &= filtered_data['Muscle Group'].isin(filters['muscle_groups']).to_numpy()
         
         # Apply exercise filter if provided
         if 'exercises' in filters and filters['exercises']:
-            filtered_data = filtered_data[filtered_data['Exercise Name'].isin(filters['exercises'])]
+            mask &= filtered_data['Exercise Name'].isin(filters['exercises']).to_numpy()
+        
+        if not mask.all():
+            filtered_data = filtered_data[mask]
         
         try:
-            # Render each tab with the filtered data
-            with tabs[0]:
-                overview.render(filtered_data)
-            
-            with tabs[1]:
-                exercise_analysis.render(filtered_data)
-            
-            with tabs[2]:
-                muscle_groups.render(filtered_data)
-            
-            with tabs[3]:
-                workout_patterns.render(filtered_data)
-            
-            with tabs[4]:
-                progress_tracking.render(filtered_data)
-            
-            with tabs[5]:
-                records_registry.render(filtered_data)
+            # Render the selected section with the filtered data
+            _render_page(sections[active_section], filtered_data)
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             st.error("Please check the logs for more details.")
@@ -11,6 +11,7 @@ try:
     from visualization.themes import GymVizTheme
     from visualization.charts.exercise_charts import create_top_exercises_chart, create_exercise_progression_chart, create_exercise_distribution_chart
     from analysis.exercise import analyze_exercise_progression, find_most_improved_exercises
+    from data.processor import get_exercise_rows, get_sorted_values
 except ImportError:
     # Temporary fallbacks for development
     pass
@@ -35,7 +36,7 @@ def render(data):
     st.markdown("### Exercise Selection")
     
     # Get sorted list of exercises
-    exercises = sorted(data['Exercise Name'].unique())
+    exercises = get_sorted_values(data, 'Exercise Name')
     selected_exercise = st.selectbox("Select an exercise to analyze", options=exercises)
     
     # Display exercise progression chart
@@ -43,7 +44,7 @@ def render(data):
         st.markdown(f"### Progression for {selected_exercise}")
         
         # For now, just display basic info until we fix the imports
-        exercise_data = data[data['Exercise Name'] == selected_exercise]
+        exercise_data = get_exercise_rows(data, selected_exercise)
         
         # Show simple stats
         col1, col2, col3, col4 = st.columns(4)
@@ -61,7 +62,7 @@ def render(data):
             st.metric("Max Volume", f"{max_volume}")
             
         with col4:
-            occurrences = len(exercise_data['Date'].unique())
+            occurrences = exercise_data['Date'].nunique()
             st.metric("Workouts", f"{occurrences}")
         
         # When imports are fixed, uncomment this:
@@ -76,17 +77,21 @@ def render(data):
     
     # For now, just show simple tables for each tab
     with metric_tabs[0]:  # Frequency
-        top_frequency = data['Exercise Name'].value_counts().reset_index()
-        top_frequency.columns = ['Exercise', 'Count']
-        st.table(top_frequency.head(10))
+        top_frequency = (
+            data.groupby('Exercise Name', observed=True, sort=False).size()
+            .nlargest(10)
+            .rename_axis('Exercise')
+            .reset_index(name='Count')
+        )
+        st.table(top_frequency)
     
     with metric_tabs[1]:  # Volume
-        top_volume = data.groupby('Exercise Name')['Volume'].sum().reset_index()
+        top_volume = data.groupby('Exercise Name', observed=True, sort=False, as_index=False)['Volume'].sum()
         top_volume = top_volume.sort_values('Volume', ascending=False)
         st.table(top_volume.head(10))
     
     with metric_tabs[2]:  # Weight
-        top_weight = data.groupby('Exercise Name')['Weight (kg)'].max().reset_index()
+        top_weight = data.groupby('Exercise Name', observed=True, sort=False, as_index=False)['Weight (kg)'].max()
         top_weight = top_weight.sort_values('Weight (kg)', ascending=False)
         st.table(top_weight.head(10))
     
@@ -98,7 +103,7 @@ def render(data):
     
     # Simple pie chart for now
     if 'Muscle Group' in data.columns:
-        muscle_counts = data.groupby('Muscle Group').size().reset_index()
+        muscle_counts = data.groupby('Muscle Group', observed=True).size().reset_index()
         muscle_counts.columns = ['Muscle Group', 'Count']
         
         fig = px.pie(
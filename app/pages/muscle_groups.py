@@ -10,6 +10,7 @@ try:
     from visualization.themes import GymVizTheme
     from visualization.charts.exercise_charts import create_exercise_distribution_chart
     from analysis.exercise import get_exercise_distribution
+    from data.processor import get_sorted_values
 except ImportError:
     # Temporary fallbacks for development
     pass
@@ -35,11 +36,11 @@ def render(data):
     
     if 'Muscle Group' in data.columns:
         # Create basic muscle group distribution visualization
-        muscle_data = data.groupby('Muscle Group').agg({
+        muscle_data = data.groupby('Muscle Group', observed=True, sort=False, as_index=False).agg({
             'Volume': 'sum',
             'Exercise Name': 'nunique',
             '_id': 'count' if '_id' in data.columns else 'size'
-        }).reset_index()
+        })
         
         muscle_data.columns = ['Muscle Group', 'Total Volume', 'Exercise Count', 'Set Count']
         
@@ -70,10 +71,16 @@ def render(data):
     if 'Muscle Group' in data.columns:
         col1, col2 = st.columns(2)
         
+        # Total volume per muscle group in one pass; missing groups count as 0
+        group_volume = data.groupby('Muscle Group', observed=True, sort=False)['Volume'].sum()
+        
+        def volume_of(groups):
+            return group_volume.reindex(groups).sum()
+        
         with col1:
             # Calculate some simple balance metrics
-            push_muscles = data[data['Muscle Group'].isin(['Chest', 'Shoulders'])]['Volume'].sum()
-            pull_muscles = data[data['Muscle Group'] == 'Back']['Volume'].sum()
+            push_muscles = volume_of(['Chest', 'Shoulders'])
+            pull_muscles = volume_of(['Back'])
             
             if pull_muscles > 0:
                 push_pull_ratio = push_muscles / pull_muscles
@@ -83,8 +90,8 @@ def render(data):
         
         with col2:
             # Calculate upper/lower ratio
-            upper_muscles = data[data['Muscle Group'].isin(['Chest', 'Back', 'Shoulders', 'Arms'])]['Volume'].sum()
-            lower_muscles = data[data['Muscle Group'] == 'Legs']['Volume'].sum()
+            upper_muscles = volume_of(['Chest', 'Back', 'Shoulders', 'Arms'])
+            lower_muscles = volume_of(['Legs'])
             
             if lower_muscles > 0:
                 upper_lower_ratio = upper_muscles / lower_muscles
@@ -98,19 +105,22 @@ def render(data):
     if 'Muscle Group' in data.columns:
         selected_muscle = st.selectbox(
             "Select a muscle group to see exercises",
-            options=sorted(data['Muscle Group'].unique())
+            options=get_sorted_values(data, 'Muscle Group')
         )
         
         if selected_muscle:
             muscle_exercises = data[data['Muscle Group'] == selected_muscle]
             
-            # Get top exercises for this muscle group
-            top_exercises = muscle_exercises.groupby('Exercise Name')['Volume'].sum().reset_index()
-            top_exercises = top_exercises.sort_values('Volume', ascending=False)
+            # Get the top 10 exercises for this muscle group
+            top_exercises = (
+                muscle_exercises.groupby('Exercise Name', observed=True, sort=False)['Volume'].sum()
+                .nlargest(10)
+                .reset_index()
+            )
             
             # Show bar chart
             fig = px.bar(
-                top_exercises.head(10),
+                top_exercises,
                 x='Exercise Name',
                 y='Volume',
                 title=f'Top Exercises for {selected_muscle}',
@@ -7,7 +7,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import logging
 
-from config.settings import MUSCLE_GROUP_COLORS
+from config.settings import MUSCLE_GROUP_COLORS, CACHE_TTL
+from data.cache import get_content_key
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +35,74 @@ except ImportError as e:
     logger.error(f"Error importing modules: {str(e)}")
     IMPORTS_SUCCESSFUL = False
 
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _cached_workout_patterns(data_key, _data):
+    """Workout pattern metrics, reused across reruns for the same data"""
+    return analyze_workout_patterns(_data)
+
+@st.cache_data(show_spinner=False, ttl=CACHE_TTL)
+def _cached_overall_stats(data_key, _data):
+    """Overall progress stats, reused across reruns for the same data"""
+    return calculate_overall_stats(_data)
+
+# Figures are rebuilt only when the data (data_key) or the chart options change;
+# the underscore-prefixed DataFrame argument is not hashed by Streamlit
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_workouts_heatmap(data_key, _data):
+    """Workout calendar heatmap for the given data"""
+    return create_workouts_heatmap(_data)
+
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_top_exercises_chart(data_key, _data, metric, n):
+    """Top exercises chart for the given data"""
+    return create_top_exercises_chart(_data, metric=metric, n=n)
+
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_workout_duration_chart(data_key, _data):
+    """Workout duration chart for the given data"""
+    return create_workout_duration_chart(_data)
+
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_exercise_variety_chart(data_key, _data):
+    """Exercise variety chart for the given data"""
+    return create_exercise_variety_chart(_data)
+
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_pr_frequency_chart(data_key, _data):
+    """PR frequency chart and PR total for the given data"""
+    return create_pr_frequency_chart(_data)
+
+@st.cache_resource(show_spinner=False, ttl=CACHE_TTL, max_entries=32)
+def _cached_muscle_distribution_chart(data_key, _data):
+    """Volume distribution pie chart by muscle group for the given data"""
+    # Get muscle group distribution
+    muscle_distribution = _data.groupby('Muscle Group', observed=True, as_index=False).agg({
+        'Exercise Name': 'nunique',
+        'Volume': 'sum',
+        '_id': 'count' if '_id' in _data.columns else 'size'
+    })
+    
+    muscle_distribution.columns = ['Muscle Group', 'Exercise Count', 'Volume', 'Set Count']
+    
+    # Create a pie chart for the distribution
+    fig = px.pie(
+        muscle_distribution,
+        values='Volume',
+        names='Muscle Group',
+        title='Volume Distribution by Muscle Group',
+        color_discrete_map=MUSCLE_GROUP_COLORS if 'MUSCLE_GROUP_COLORS' in globals() else None,
+        hover_data=['Exercise Count', 'Set Count']
+    )
+    
+    # Apply dark mode
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    
+    return fig
+
 def render(data):
     """
     Render the overview dashboard page
@@ -51,18 +120,21 @@ def render(data):
         return
     
     try:
+        # Hash the data once; every cached metric and figure below is keyed on it
+        data_key = get_content_key(data)
+        
         # Calculate overview metrics
         with st.spinner("Calculating metrics..."):
             # If imports failed, use simple calculation functions
             if IMPORTS_SUCCESSFUL:
-                patterns = analyze_workout_patterns(data)
-                stats = calculate_overall_stats(data)
+                patterns = _cached_workout_patterns(data_key, data)
+                stats = _cached_overall_stats(data_key, data)
             else:
                 # Fallback calculations
                 patterns = {
                     'avg_weekly_workouts': data.drop_duplicates(['Date', 'Workout Name']).groupby('Date').size().mean(),
                     'longest_streak': 1,
-                    'most_common_day': data['Date'].dt.day_name().value_counts().idxmax() if 'Date' in data.columns else 'Unknown'
+                    'most_common_day': data['Weekday'].value_counts().idxmax() if 'Weekday' in data.columns else 'Unknown'
                 }
                 stats = {
                     'pr_count': 0,
@@ -145,7 +217,7 @@ def render(data):
         
         try:
             # Create workout calendar heatmap
-            heatmap = create_workouts_heatmap(data)
+            heatmap = _cached_workouts_heatmap(data_key, data)
             st.plotly_chart(heatmap, use_container_width=True)
         except Exception as e:
             logger.error(f"Error creating workout heatmap: {str(e)}")
@@ -160,7 +232,7 @@ def render(data):
             
             try:
                 # Create top exercises by frequency chart
-                top_freq = create_top_exercises_chart(data, metric='frequency', n=10)
+                top_freq = _cached_top_exercises_chart(data_key, data, 'frequency', 10)
                 if top_freq:
                     st.plotly_chart(top_freq, use_container_width=True)
                 else:
@@ -175,7 +247,7 @@ def render(data):
             
             try:
                 # Create top exercises by volume chart
-                top_vol = create_top_exercises_chart(data, metric='volume', n=10)
+                top_vol = _cached_top_exercises_chart(data_key, data, 'volume', 10)
                 if top_vol:
                     st.plotly_chart(top_vol, use_container_width=True)
                 else:
@@ -195,7 +267,7 @@ def render(data):
             
             try:
                 # Create workout duration chart
-                duration_chart = create_workout_duration_chart(data)
+                duration_chart = _cached_workout_duration_chart(data_key, data)
                 if duration_chart is not None:
                     st.plotly_chart(duration_chart, use_container_width=True)
                 else:
@@ -210,7 +282,7 @@ def render(data):
             
             try:
                 # Create exercise variety chart
-                variety_chart = create_exercise_variety_chart(data)
+                variety_chart = _cached_exercise_variety_chart(data_key, data)
                 if variety_chart:
                     st.plotly_chart(variety_chart, use_container_width=True)
                 else:
@@ -230,8 +302,8 @@ def render(data):
             
             if available_pr_columns:
                 # Create PR frequency chart
-                pr_chart = create_pr_frequency_chart(data)
-                if pr_chart is not None:
+                pr_chart, pr_total = _cached_pr_frequency_chart(data_key, data)
+                if pr_chart is not None and pr_total > 0:
                     st.plotly_chart(pr_chart, use_container_width=True)
                 else:
                     st.info("No personal records found in the selected period.")
@@ -248,32 +320,7 @@ def render(data):
         
         try:
             if 'Muscle Group' in data.columns:
-                # Get muscle group distribution
-                muscle_distribution = data.groupby('Muscle Group').agg({
-                    'Exercise Name': lambda x: len(x.unique()),
-                    'Volume': 'sum',
-                    '_id': 'count' if '_id' in data.columns else 'size'
-                }).reset_index()
-                
-                muscle_distribution.columns = ['Muscle Group', 'Exercise Count', 'Volume', 'Set Count']
-                
-                # Create a pie chart for the distribution
-                fig = px.pie(
-                    muscle_distribution,
-                    values='Volume',
-                    names='Muscle Group',
-                    title='Volume Distribution by Muscle Group',
-                    color_discrete_map=MUSCLE_GROUP_COLORS if 'MUSCLE_GROUP_COLORS' in globals() else None,
-                    hover_data=['Exercise Count', 'Set Count']
-                )
-                
-                # Apply dark mode
-                fig.update_layout(
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white')
-                )
-                
+                fig = _cached_muscle_distribution_chart(data_key, data)
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Muscle group information is not available in this dataset.")
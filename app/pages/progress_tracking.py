@@ -3,13 +3,15 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.graph_objects as go
 
 # These imports will be fixed later when we solve the import issues
 try:
     from visualization.themes import GymVizTheme
     from visualization.charts.progress_charts import create_volume_progression_chart, create_pr_frequency_chart
     from analysis.progress import calculate_overall_stats
+    from data.processor import count_personal_records, get_first_last_sets, get_pr_mask
 except ImportError:
     # Temporary fallbacks for development
     pass
@@ -34,15 +36,7 @@ def render(data):
     st.markdown("### Overall Progress")
     
     # Calculate PR counts
-    pr_columns = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR', 'Is Any PR']
-    available_pr_columns = [col for col in pr_columns if col in data.columns]
-    
-    pr_count = 0
-    if 'Is Any PR' in available_pr_columns:
-        pr_count = data['Is Any PR'].sum()
-    elif available_pr_columns:
-        # Sum all PR types
-        pr_count = data[available_pr_columns].sum().sum()
+    pr_count = count_personal_records(data)
     
     # Calculate basic progress metrics
     total_volume = data['Volume'].sum()
@@ -74,41 +68,47 @@ def render(data):
     st.markdown("### Volume Progression")
     
     # Create a simple volume progression chart for now
-    volume_by_month = data.groupby(data['Date'].dt.strftime('%Y-%m'))['Volume'].sum().reset_index()
+    volume_by_month = data.groupby('YearMonth', as_index=False)['Volume'].sum()
     volume_by_month.columns = ['Month', 'Volume']
     
-    fig = px.line(
-        volume_by_month,
-        x='Month',
-        y='Volume',
+    fig = go.Figure(go.Scatter(
+        x=volume_by_month['Month'].to_numpy(),
+        y=volume_by_month['Volume'].to_numpy(),
+        mode='lines+markers',
+        name='Volume'
+    ))
+    fig.update_layout(
         title='Volume Progression by Month',
-        markers=True,
+        xaxis_title='Month',
+        yaxis_title='Volume'
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(GymVizTheme.optimize_traces(fig), use_container_width=True)
     
     # PR Frequency
     st.markdown("### Personal Records")
     
     # Create PR frequency chart if PR data is available
     if pr_count > 0:
-        if 'Is Any PR' in data.columns:
-            pr_data = data[data['Is Any PR']]
-        elif available_pr_columns:
-            pr_data = data[data[available_pr_columns].any(axis=1)]
-        else:
-            pr_data = pd.DataFrame()
+        pr_data = data[get_pr_mask(data)]
         
         if not pr_data.empty:
-            pr_by_month = pr_data.groupby(pr_data['Date'].dt.strftime('%Y-%m')).size().reset_index()
-            pr_by_month.columns = ['Month', 'PR Count']
+            # One pass over the PR dates; period ordinals sort chronologically
+            pr_by_month = pr_data['Date'].dt.to_period('M').value_counts().sort_index()
+            pr_by_month = pd.DataFrame({
+                'Month': pr_by_month.index.strftime('%Y-%m'),
+                'PR Count': pr_by_month.to_numpy()
+            })
             
-            fig = px.bar(
-                pr_by_month,
-                x='Month',
-                y='PR Count',
+            fig = go.Figure(go.Bar(
+                x=pr_by_month['Month'].to_numpy(),
+                y=pr_by_month['PR Count'].to_numpy(),
+                name='PR Count'
+            ))
+            fig.update_layout(
                 title='Personal Records by Month',
-                labels={'PR Count': 'Number of PRs'}
+                xaxis_title='Month',
+                yaxis_title='Number of PRs'
             )
             
             st.plotly_chart(fig, use_container_width=True)
@@ -120,40 +120,29 @@ def render(data):
     
     # Create a simple table of improved exercises
     if len(data['Date'].unique()) > 1:
-        improvements = []
+        # First and last set of every exercise, in one pass
+        first, last, counts = get_first_last_sets(data)
         
-        for exercise in data['Exercise Name'].unique():
-            ex_data = data[data['Exercise Name'] == exercise].copy()
-            
-            if len(ex_data) < 2:
-                continue
-                
-            # Sort by date
-            ex_data = ex_data.sort_values('Date')
-            
-            # Get first and last values
-            first = ex_data.iloc[0]
-            last = ex_data.iloc[-1]
-            
-            if first['Weight (kg)'] > 0:
-                weight_change = ((last['Weight (kg)'] - first['Weight (kg)']) / first['Weight (kg)']) * 100
-            else:
-                weight_change = 0
-                
-            days = (last['Date'] - first['Date']).days
-            
-            if days > 7:  # Only include exercises with some time between measurements
-                improvements.append({
-                    'Exercise': exercise,
-                    'Start Weight': first['Weight (kg)'],
-                    'End Weight': last['Weight (kg)'],
-                    'Change %': weight_change,
-                    'Days': days
-                })
+        start_weight = first['Weight (kg)'].to_numpy()
+        end_weight = last['Weight (kg)'].to_numpy()
+        weight_change = np.divide(
+            end_weight - start_weight, start_weight,
+            out=np.zeros(len(first), dtype=start_weight.dtype), where=start_weight > 0
+        ).astype(float) * 100
+        days = (last['Date'] - first['Date']).dt.days.to_numpy()
+        
+        # Only include exercises with some time between measurements
+        keep = (counts.to_numpy() >= 2) & (days > 7)
         
-        if improvements:
+        if keep.any():
             # Convert to DataFrame and sort
-            improvements_df = pd.DataFrame(improvements)
+            improvements_df = pd.DataFrame({
+                'Exercise': first.index.to_numpy()[keep],
+                'Start Weight': start_weight[keep],
+                'End Weight': end_weight[keep],
+                'Change %': weight_change[keep],
+                'Days': days[keep]
+            })
             improvements_df = improvements_df.sort_values('Change %', ascending=False)
             
             # Show top improvements
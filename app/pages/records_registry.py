@@ -3,8 +3,155 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 
+from data.cache import get_content_key
+from data.processor import get_exercise_rows, get_sorted_values
+from utils.date_utils import downsample_daily, format_dates
+from visualization.themes import GymVizTheme
+
+def _record_list(date_texts, value_texts):
+    """
+    Build the HTML for a list of record boxes
+    
+    Parameters:
+    -----------
+    date_texts : pandas Series
+        Text for each date line
+    value_texts : pandas Series
+        Text for each record value line, aligned with date_texts
+        
+    Returns:
+    --------
+    str
+        Concatenated record box HTML
+    """
+    # Assemble every box with element-wise string concatenation, then join once
+    boxes = (
+        '<div class="record-box"><div class="record-date">' + date_texts
+        + '</div><div class="record-value">' + value_texts + '</div></div>'
+    )
+    
+    return boxes.str.cat()
+
+# PR flag column and the value column that ranks records of that type
+RECORD_TYPES = {
+    'Is Weight PR': 'Weight (kg)',
+    'Is Reps PR': 'Reps',
+    'Is Volume PR': 'Volume',
+    'Is 1RM PR': '1RM'
+}
+
+# PR flag column and its display label
+RECORD_LABELS = {
+    'Is Weight PR': 'Weight',
+    'Is Reps PR': 'Reps',
+    'Is Volume PR': 'Volume',
+    'Is 1RM PR': '1RM'
+}
+
+def _pr_type_labels(prs, available_pr_columns):
+    """
+    Describe which PR types each row set, e.g. "Weight, 1RM"
+    
+    Parameters:
+    -----------
+    prs : pandas DataFrame
+        PR rows
+    available_pr_columns : list
+        PR flag columns present in the data
+        
+    Returns:
+    --------
+    pandas Series
+        Comma-separated PR type labels, aligned with prs
+    """
+    labels = pd.Series('', index=prs.index)
+    
+    # One vectorized pass per PR type rather than one Python pass per row
+    for pr_col, label in RECORD_LABELS.items():
+        if pr_col in available_pr_columns:
+            labels = labels + np.where(prs[pr_col], f'{label}, ', '')
+    
+    return labels.str[:-2]
+
+def _build_record_tables(data, available_pr_columns):
+    """
+    Build the per-type personal record tables shown on the page
+    
+    Parameters:
+    -----------
+    data : pandas DataFrame
+        The filtered workout data
+    available_pr_columns : list
+        PR flag columns present in the data
+        
+    Returns:
+    --------
+    dict
+        Best PR row per exercise for each PR type, plus all PRs
+        (most recent first) under 'Is Any PR'
+    """
+    tables = {pr_col: pd.DataFrame() for pr_col in RECORD_TYPES}
+    record_types = {pr_col: value_col for pr_col, value_col in RECORD_TYPES.items() if pr_col in available_pr_columns}
+    
+    if record_types:
+        # Rank each value column with non-PR sets pushed to -inf, so one grouped
+        # idxmax finds the best PR row of every type for every exercise
+        flags = data[list(record_types)].to_numpy(dtype=bool)
+        ranked = pd.DataFrame(
+            np.where(flags, data[list(record_types.values())].to_numpy(dtype=np.float64), -np.inf),
+            columns=list(record_types)
+        )
+        exercise_key = data['Exercise Name'].reset_index(drop=True)
+        best_rows = ranked.groupby(exercise_key, observed=True, dropna=False).idxmax().to_numpy()
+        
+        for position, pr_col in enumerate(record_types):
+            # Exercises without any PR of this type fall back to a non-PR row; drop those
+            rows = best_rows[:, position]
+            tables[pr_col] = data.iloc[rows[flags[rows, position]]]
+    
+    # Get all PRs
+    if 'Is Any PR' in available_pr_columns:
+        all_prs = data[data['Is Any PR'] == True]
+    else:
+        # Combine all available PR columns
+        all_prs = data[data[available_pr_columns].any(axis=1)]
+    
+    # Sort by date (most recent first)
+    tables['Is Any PR'] = all_prs.sort_values('Date', ascending=False)
+    
+    return tables
+
+def _get_record_tables(data, available_pr_columns):
+    """
+    Get the record tables, reusing this session's copy while the data is unchanged
+    
+    Parameters:
+    -----------
+    data : pandas DataFrame
+        The filtered workout data
+    available_pr_columns : list
+        PR flag columns present in the data
+        
+    Returns:
+    --------
+    dict
+        Record tables as returned by _build_record_tables
+    """
+    # Identify the slice by a hash of its contents, so corrected values are never served stale
+    key = (get_content_key(data), tuple(available_pr_columns))
+    
+    cached = st.session_state.get('_records_registry_cache')
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    tables = _build_record_tables(data, available_pr_columns)
+    st.session_state['_records_registry_cache'] = (key, tables)
+    
+    return tables
+
 def render(data):
     """
     Render the records registry dashboard page
@@ -29,23 +176,20 @@ def render(data):
     available_pr_columns = [col for col in pr_columns if col in data.columns]
     
     if available_pr_columns:
+        record_tables = _get_record_tables(data, available_pr_columns)
+        
         # Create tabs for different PR types
         pr_tabs = st.tabs(["Weight PRs", "Rep PRs", "Volume PRs", "1RM PRs", "All PRs"])
         
         with pr_tabs[0]:  # Weight PRs
             if 'Is Weight PR' in available_pr_columns:
-                weight_prs = data[data['Is Weight PR'] == True].copy() if 'Is Weight PR' in data.columns else pd.DataFrame()
+                weight_prs = record_tables['Is Weight PR']
                 if not weight_prs.empty:
-                    weight_prs = weight_prs.sort_values(['Exercise Name', 'Weight (kg)'], ascending=[True, False])
-                    weight_prs = weight_prs.drop_duplicates('Exercise Name', keep='first')
-                    
-                    for _, row in weight_prs.iterrows():
-                        st.markdown(f"""
-                        <div class="record-box">
-                            <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                            <div class="record-value">{row['Exercise Name']}: {row['Weight (kg)']} kg × {row['Reps']} reps</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown(_record_list(
+                        format_dates(weight_prs['Date'], '%b %d, %Y'),
+                        weight_prs['Exercise Name'].astype(str) + ': ' + weight_prs['Weight (kg)'].astype(str)
+                        + ' kg × ' + weight_prs['Reps'].astype(str) + ' reps'
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No weight PRs found in the selected period.")
             else:
@@ -53,18 +197,13 @@ def render(data):
         
         with pr_tabs[1]:  # Rep PRs
             if 'Is Reps PR' in available_pr_columns:
-                rep_prs = data[data['Is Reps PR'] == True].copy() if 'Is Reps PR' in data.columns else pd.DataFrame()
+                rep_prs = record_tables['Is Reps PR']
                 if not rep_prs.empty:
-                    rep_prs = rep_prs.sort_values(['Exercise Name', 'Reps'], ascending=[True, False])
-                    rep_prs = rep_prs.drop_duplicates('Exercise Name', keep='first')
-                    
-                    for _, row in rep_prs.iterrows():
-                        st.markdown(f"""
-                        <div class="record-box">
-                            <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                            <div class="record-value">{row['Exercise Name']}: {row['Reps']} reps at {row['Weight (kg)']} kg</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown(_record_list(
+                        format_dates(rep_prs['Date'], '%b %d, %Y'),
+                        rep_prs['Exercise Name'].astype(str) + ': ' + rep_prs['Reps'].astype(str)
+                        + ' reps at ' + rep_prs['Weight (kg)'].astype(str) + ' kg'
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No rep PRs found in the selected period.")
             else:
@@ -72,18 +211,12 @@ def render(data):
         
         with pr_tabs[2]:  # Volume PRs
             if 'Is Volume PR' in available_pr_columns:
-                volume_prs = data[data['Is Volume PR'] == True].copy() if 'Is Volume PR' in data.columns else pd.DataFrame()
+                volume_prs = record_tables['Is Volume PR']
                 if not volume_prs.empty:
-                    volume_prs = volume_prs.sort_values(['Exercise Name', 'Volume'], ascending=[True, False])
-                    volume_prs = volume_prs.drop_duplicates('Exercise Name', keep='first')
-                    
-                    for _, row in volume_prs.iterrows():
-                        st.markdown(f"""
-                        <div class="record-box">
-                            <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                            <div class="record-value">{row['Exercise Name']}: {row['Volume']} (kg×reps)</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown(_record_list(
+                        format_dates(volume_prs['Date'], '%b %d, %Y'),
+                        volume_prs['Exercise Name'].astype(str) + ': ' + volume_prs['Volume'].astype(str) + ' (kg×reps)'
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No volume PRs found in the selected period.")
             else:
@@ -91,18 +224,12 @@ def render(data):
         
         with pr_tabs[3]:  # 1RM PRs
             if 'Is 1RM PR' in available_pr_columns:
-                orm_prs = data[data['Is 1RM PR'] == True].copy() if 'Is 1RM PR' in data.columns else pd.DataFrame()
+                orm_prs = record_tables['Is 1RM PR']
                 if not orm_prs.empty:
-                    orm_prs = orm_prs.sort_values(['Exercise Name', '1RM'], ascending=[True, False])
-                    orm_prs = orm_prs.drop_duplicates('Exercise Name', keep='first')
-                    
-                    for _, row in orm_prs.iterrows():
-                        st.markdown(f"""
-                        <div class="record-box">
-                            <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                            <div class="record-value">{row['Exercise Name']}: Estimated 1RM of {row['1RM']} kg</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown(_record_list(
+                        format_dates(orm_prs['Date'], '%b %d, %Y'),
+                        orm_prs['Exercise Name'].astype(str) + ': Estimated 1RM of ' + orm_prs['1RM'].astype(str) + ' kg'
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No 1RM PRs found in the selected period.")
             else:
@@ -110,37 +237,16 @@ def render(data):
         
         with pr_tabs[4]:  # All PRs
             if 'Is Any PR' in available_pr_columns or len(available_pr_columns) > 0:
-                # Get all PRs
-                if 'Is Any PR' in available_pr_columns:
-                    all_prs = data[data['Is Any PR'] == True].copy()
-                else:
-                    # Combine all available PR columns
-                    all_prs = data[data[available_pr_columns].any(axis=1)].copy()
+                # Get all PRs, most recent first
+                all_prs = record_tables['Is Any PR']
                 
                 if not all_prs.empty:
-                    # Sort by date (most recent first)
-                    all_prs = all_prs.sort_values('Date', ascending=False)
-                    
-                    for _, row in all_prs.iterrows():
-                        pr_types = []
-                        
-                        if 'Is Weight PR' in available_pr_columns and row['Is Weight PR']:
-                            pr_types.append("Weight")
-                        if 'Is Reps PR' in available_pr_columns and row['Is Reps PR']:
-                            pr_types.append("Reps")
-                        if 'Is Volume PR' in available_pr_columns and row['Is Volume PR']:
-                            pr_types.append("Volume")
-                        if 'Is 1RM PR' in available_pr_columns and row['Is 1RM PR']:
-                            pr_types.append("1RM")
-                        
-                        pr_type_str = ", ".join(pr_types)
-                        
-                        st.markdown(f"""
-                        <div class="record-box">
-                            <div class="record-date">{row['Date'].strftime('%b %d, %Y')} - {pr_type_str} PR</div>
-                            <div class="record-value">{row['Exercise Name']}: {row['Weight (kg)']} kg × {row['Reps']} reps</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    st.markdown(_record_list(
+                        format_dates(all_prs['Date'], '%b %d, %Y') + ' - '
+                        + _pr_type_labels(all_prs, available_pr_columns) + ' PR',
+                        all_prs['Exercise Name'].astype(str) + ': ' + all_prs['Weight (kg)'].astype(str)
+                        + ' kg × ' + all_prs['Reps'].astype(str) + ' reps'
+                    ), unsafe_allow_html=True)
                 else:
                     st.info("No PRs found in the selected period.")
             else:
@@ -150,12 +256,12 @@ def render(data):
         st.info("Personal record tracking data is not available. Showing maximum values instead.")
         
         # Get max values for each exercise
-        max_values = data.groupby('Exercise Name').agg({
+        max_values = data.groupby('Exercise Name', observed=True, sort=False, as_index=False).agg({
             'Weight (kg)': 'max',
             'Reps': 'max',
             'Volume': 'max',
             'Date': 'max'  # Get the latest date
-        }).reset_index()
+        })
         
         # Sort by weight
         max_values = max_values.sort_values('Weight (kg)', ascending=False)
@@ -167,10 +273,12 @@ def render(data):
     st.markdown("### Records by Exercise")
     
     # Exercise selector
-    exercise = st.selectbox("Select an exercise", options=sorted(data['Exercise Name'].unique()))
+    exercise = st.selectbox("Select an exercise", options=get_sorted_values(data, 'Exercise Name'))
     
     if exercise:
-        exercise_data = data[data['Exercise Name'] == exercise].copy()
+        exercise_data = get_exercise_rows(
+            data, exercise, ['Date', 'Weight (kg)', 'Reps', 'Volume', '1RM'] + available_pr_columns
+        )
         
         # Show max values
         max_weight = exercise_data['Weight (kg)'].max()
@@ -198,12 +306,12 @@ def render(data):
         # Show progression chart
         st.markdown("#### Progression")
         
-        # Create simple progression chart
-        ex_prog = exercise_data.groupby('Date').agg({
+        # Create simple progression chart (weekly averages for very long histories)
+        ex_prog = downsample_daily(exercise_data.groupby('Date', as_index=False).agg({
             'Weight (kg)': 'max',
             'Reps': 'max',
             'Volume': 'sum'
-        }).reset_index()
+        }))
         
         # Plot weight progression
         fig = px.line(
@@ -214,7 +322,7 @@ def render(data):
             markers=True,
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(GymVizTheme.optimize_traces(fig), use_container_width=True)
         
         # Show personal records for this exercise
         st.markdown("#### Personal Records")
@@ -224,26 +332,11 @@ def render(data):
             if not ex_prs.empty:
                 ex_prs = ex_prs.sort_values('Date', ascending=False)
                 
-                for _, row in ex_prs.iterrows():
-                    pr_types = []
-                    
-                    if 'Is Weight PR' in available_pr_columns and row['Is Weight PR']:
-                        pr_types.append("Weight")
-                    if 'Is Reps PR' in available_pr_columns and row['Is Reps PR']:
-                        pr_types.append("Reps")
-                    if 'Is Volume PR' in available_pr_columns and row['Is Volume PR']:
-                        pr_types.append("Volume")
-                    if 'Is 1RM PR' in available_pr_columns and row['Is 1RM PR']:
-                        pr_types.append("1RM")
-                    
-                    pr_type_str = ", ".join(pr_types)
-                    
-                    st.markdown(f"""
-                    <div class="record-box">
-                        <div class="record-date">{row['Date'].strftime('%b %d, %Y')} - {pr_type_str} PR</div>
-                        <div class="record-value">{row['Weight (kg)']} kg × {row['Reps']} reps</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(_record_list(
+                    format_dates(ex_prs['Date'], '%b %d, %Y') + ' - '
+                    + _pr_type_labels(ex_prs, available_pr_columns) + ' PR',
+                    ex_prs['Weight (kg)'].astype(str) + ' kg × ' + ex_prs['Reps'].astype(str) + ' reps'
+                ), unsafe_allow_html=True)
             else:
                 st.info("No personal records found for this exercise in the selected period.")
         else:
@@ -253,21 +346,15 @@ def render(data):
             # Sort by weight and show top 5
             top_weight = exercise_data.sort_values('Weight (kg)', ascending=False).head(5)
             st.markdown("##### Top Weight Sets")
-            for _, row in top_weight.iterrows():
-                st.markdown(f"""
-                <div class="record-box">
-                    <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                    <div class="record-value">{row['Weight (kg)']} kg × {row['Reps']} reps</div>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown(_record_list(
+                format_dates(top_weight['Date'], '%b %d, %Y'),
+                top_weight['Weight (kg)'].astype(str) + ' kg × ' + top_weight['Reps'].astype(str) + ' reps'
+            ), unsafe_allow_html=True)
             
             # Sort by reps and show top 5
             top_reps = exercise_data.sort_values('Reps', ascending=False).head(5)
             st.markdown("##### Top Rep Sets")
-            for _, row in top_reps.iterrows():
-                st.markdown(f"""
-                <div class="record-box">
-                    <div class="record-date">{row['Date'].strftime('%b %d, %Y')}</div>
-                    <div class="record-value">{row['Reps']} reps at {row['Weight (kg)']} kg</div>
-                </div>
-                """, unsafe_allow_html=True)
\ No newline at end of file
+            st.markdown(_record_list(
+                format_dates(top_reps['Date'], '%b %d, %Y'),
+                top_reps['Reps'].astype(str) + ' reps at ' + top_reps['Weight (kg)'].astype(str) + ' kg'
+            ), unsafe_allow_html=True)
\ No newline at end of file
@@ -10,6 +10,9 @@ try:
     from visualization.themes import GymVizTheme
     from visualization.charts.workout_charts import create_workouts_heatmap, create_workout_frequency_chart
     from analysis.workout import analyze_workout_patterns
+    from data.processor import get_unique_workouts
+    from utils.date_utils import find_streaks, unique_days
+    from config.settings import WEEKDAY_NAMES
 except ImportError:
     # Temporary fallbacks for development
     pass
@@ -34,35 +37,21 @@ def render(data):
     st.markdown("### Workout Consistency")
     
     # Calculate basic metrics manually
-    unique_dates = data['Date'].dt.date.unique()
+    unique_dates = unique_days(data['Date'])
     total_workouts = len(unique_dates)
     
     if total_workouts > 0:
-        min_date = min(unique_dates)
-        max_date = max(unique_dates)
-        date_range_days = (max_date - min_date).days + 1
+        min_date = unique_dates[0]
+        max_date = unique_dates[-1]
+        date_range_days = int((max_date - min_date).astype('int64')) + 1
         
         # Calculate weeks
         weeks = date_range_days / 7
         workouts_per_week = total_workouts / weeks if weeks > 0 else 0
         
         # Calculate streaks
-        dates = sorted(unique_dates)
-        streaks = []
-        current_streak = [dates[0]]
-        
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i-1]).days == 1:
-                current_streak.append(dates[i])
-            else:
-                if len(current_streak) > 1:
-                    streaks.append(current_streak)
-                current_streak = [dates[i]]
-        
-        if len(current_streak) > 1:
-            streaks.append(current_streak)
-        
-        longest_streak = max(len(streak) for streak in streaks) if streaks else 1
+        _, _, streak_lengths = find_streaks(data['Date'])
+        longest_streak = int(streak_lengths.max()) if len(streak_lengths) else 1
         
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -84,11 +73,15 @@ def render(data):
     # Workout Frequency Chart
     st.markdown("### Workout Frequency")
     
-    # Create a simple frequency chart for now
-    workout_dates = data['Date'].dt.to_period('M').value_counts().reset_index()
-    workout_dates.columns = ['Month', 'Count']
-    workout_dates = workout_dates.sort_values('Month')
-    workout_dates['Month'] = workout_dates['Month'].astype(str)
+    # Count workouts per calendar month (period ordinals group and sort as int64)
+    workouts = get_unique_workouts(data)
+    monthly_counts = workouts.groupby(workouts['Date'].dt.to_period('M')).size()
+    
+    # Format the month labels once, on the grouped index
+    workout_dates = pd.DataFrame({
+        'Month': monthly_counts.index.strftime('%Y-%m'),
+        'Count': monthly_counts.to_numpy()
+    })
     
     fig = px.bar(
         workout_dates,
@@ -103,14 +96,13 @@ def render(data):
     # Workout Day Distribution
     st.markdown("### Workout Day Distribution")
     
-    # Count workouts by day of week
-    day_counts = data['Date'].dt.day_name().value_counts().reset_index()
-    day_counts.columns = ['Day', 'Count']
-    
-    # Reorder days
-    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_counts['Day'] = pd.Categorical(day_counts['Day'], categories=days_order, ordered=True)
-    day_counts = day_counts.sort_values('Day')
+    # Count workouts by day of week, in calendar order
+    day_counts = (
+        data['Weekday'].value_counts(sort=False)
+        .reindex(WEEKDAY_NAMES, fill_value=0)
+        .rename_axis('Day')
+        .reset_index(name='Count')
+    )
     
     fig = px.bar(
         day_counts,
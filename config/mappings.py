@@ -3,6 +3,7 @@
 
 import re
 import logging
+from functools import lru_cache
 from config.settings import DEBUG
 
 # Configure logging
@@ -394,10 +395,24 @@ MUSCLE_GROUP_PATTERNS = {
     ]
 }
 
+# Lowercased names for case-insensitive matching (the first spelling wins)
+_LOWER_EXERCISE_ITEMS = tuple((name.lower(), group) for name, group in EXERCISE_MUSCLE_MAP.items())
+_LOWER_EXERCISE_MAP = dict(reversed(_LOWER_EXERCISE_ITEMS))
+
+# One compiled alternation per muscle group, checked in MUSCLE_GROUP_PATTERNS order
+MUSCLE_GROUP_REGEXES = tuple(
+    (muscle_group, re.compile('|'.join(patterns)))
+    for muscle_group, patterns in MUSCLE_GROUP_PATTERNS.items()
+)
+
+@lru_cache(maxsize=1024)
 def map_exercise_to_muscle_group(exercise_name):
     """
     Map exercise name to muscle group
     
+    Results are cached per name, so each distinct exercise is matched once
+    per process rather than once per upload or filter change.
+    
     Parameters:
     -----------
     exercise_name : str
@@ -412,21 +427,19 @@ def map_exercise_to_muscle_group(exercise_name):
         return "Other"
     
     # First try direct lookup (case insensitive)
-    for name, muscle_group in EXERCISE_MUSCLE_MAP.items():
-        if name.lower() == exercise_name.lower():
-            return muscle_group
+    exercise_lower = exercise_name.lower()
+    if exercise_lower in _LOWER_EXERCISE_MAP:
+        return _LOWER_EXERCISE_MAP[exercise_lower]
     
     # Then try case-insensitive partial matching
-    exercise_lower = exercise_name.lower()
-    for name, muscle_group in EXERCISE_MUSCLE_MAP.items():
-        if name.lower() in exercise_lower or exercise_lower in name.lower():
+    for name_lower, muscle_group in _LOWER_EXERCISE_ITEMS:
+        if name_lower in exercise_lower or exercise_lower in name_lower:
             return muscle_group
     
     # If direct lookup fails, use regex patterns
-    for muscle_group, patterns in MUSCLE_GROUP_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, exercise_lower):
-                return muscle_group
+    for muscle_group, regex in MUSCLE_GROUP_REGEXES:
+        if regex.search(exercise_lower):
+            return muscle_group
     
     # If all else fails, return "Other"
     logger.debug(f"Could not map exercise to muscle group: {exercise_name}")
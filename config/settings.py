@@ -1,7 +1,7 @@
 # gymviz/config/settings.py
 # Configuration settings for the GymViz application
 
-import plotly.express as px
+from plotly import colors
 
 # App settings
 APP_TITLE = "GymViz - Advanced Workout Analytics"
@@ -68,15 +68,15 @@ MUSCLE_GROUP_COLORS = {
 
 # Color scales for continuous variables - dark mode optimized
 COLOR_SCALES = {
-    "volume": px.colors.sequential.Plasma,         # Yellow-purple
-    "weight": px.colors.sequential.Viridis,        # Blue-green-yellow
-    "reps": px.colors.sequential.Cividis,          # Yellow-blue
-    "intensity": px.colors.sequential.Turbo,       # Blue-green-yellow-red
-    "frequency": px.colors.sequential.Magma,       # Purple-orange
-    "progress": px.colors.sequential.Inferno,      # Purple-orange-yellow
-    "heatmap": px.colors.sequential.YlGnBu,        # Yellow-green-blue
-    "balance": px.colors.diverging.RdBu,           # Red-white-blue
-    "timeline": px.colors.sequential.Plasma        # Yellow-purple
+    "volume": colors.sequential.Plasma,            # Yellow-purple
+    "weight": colors.sequential.Viridis,           # Blue-green-yellow
+    "reps": colors.sequential.Cividis,             # Yellow-blue
+    "intensity": colors.sequential.Turbo,          # Blue-green-yellow-red
+    "frequency": colors.sequential.Magma,          # Purple-orange
+    "progress": colors.sequential.Inferno,         # Purple-orange-yellow
+    "heatmap": colors.sequential.YlGnBu,           # Yellow-green-blue
+    "balance": colors.diverging.RdBu,              # Red-white-blue
+    "timeline": colors.sequential.Plasma           # Yellow-purple
 }
 
 # Plot layout settings - dark mode
@@ -113,22 +113,36 @@ CHART_HEIGHT = {
     "extra_large": 600,
 }
 
+# Daily series longer than this are plotted as weekly averages
+MAX_CHART_POINTS = 500
+
 # Dashboard layout
 DASHBOARD_COLUMNS = 12  # Bootstrap-like grid system
 
 # Data processing settings
 DEFAULT_DATE_RANGE_DAYS = 180  # Default to showing last 6 months
+CATEGORY_COLUMNS = ['Exercise Name', 'Workout Name', 'Muscle Group', 'Weekday']  # Stored as pandas category
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 # CSV parsing settings
 CSV_SETTINGS = {
     "separator": ";",
     "encoding": "utf-8",
     "date_format": "%Y-%m-%d",
+    "datetime_format": "%Y-%m-%d %H:%M:%S",
 }
 
+# Bytes per block handed to each pyarrow CSV reader thread
+CSV_BLOCK_SIZE = 1 << 20
+
+# Large CSV exports are read in chunks to bound peak memory
+CSV_CHUNK_SIZE = 200_000  # Rows per chunk
+CSV_CHUNK_THRESHOLD = 50 * 1024 * 1024  # Files larger than this (bytes) are chunked
+
 # Cache settings
 CACHE_ENABLED = True
 CACHE_TTL = 3600  # Cache time-to-live in seconds (1 hour)
+SIDECAR_CACHE_VERSION = 1  # Bump when the parsed layout changes to invalidate old sidecars
 
 # Default directories
 DEFAULT_DATA_PATH = "data/samples/"
@@ -0,0 +1,155 @@
+# gymviz/data/cache.py
+# Caching functionality for GymViz
+
+import os
+import hashlib
+import logging
+import tempfile
+
+import pandas as pd
+
+from config.settings import CACHE_ENABLED, DEBUG, SIDECAR_CACHE_VERSION
+
+# Arrow support is optional - without pyarrow the CSV is simply re-parsed
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(
+    level=logging.DEBUG if DEBUG else logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Schema metadata key recording which layout version wrote a sidecar
+_VERSION_KEY = b'gymviz_cache_version'
+
+def get_content_key(df):
+    """
+    Get a key that changes whenever the rows, values or columns of a DataFrame do
+    
+    Used to key per-page caches, so that data re-uploaded with different
+    values is never served from an older result.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Data to identify
+        
+    Returns:
+    --------
+    tuple
+        (md5 hex digest of the row hashes, column names)
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.md5(row_hashes.tobytes()).hexdigest(), tuple(df.columns)
+
+def get_sidecar_path(csv_path):
+    """
+    Get the path of the Arrow sidecar for a CSV file
+    
+    Parameters:
+    -----------
+    csv_path : str
+        Path to the CSV file
+        
+    Returns:
+    --------
+    str
+        Path to the sidecar (e.g. strong.csv -> strong.feather)
+    """
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+def read_sidecar(csv_path):
+    """
+    Read the Arrow sidecar for a CSV file if it is present and up to date
+    
+    The sidecar is memory-mapped, so only the buffers pandas needs are paged in.
+    
+    Parameters:
+    -----------
+    csv_path : str
+        Path to the CSV file
+        
+    Returns:
+    --------
+    pandas DataFrame or None
+        Cached data, or None if there is no usable sidecar
+    """
+    if not (CACHE_ENABLED and ARROW_AVAILABLE):
+        return None
+    
+    sidecar_path = get_sidecar_path(csv_path)
+    
+    try:
+        # Only trust a sidecar written after the CSV was last modified
+        if not os.path.exists(sidecar_path) or os.path.getmtime(sidecar_path) < os.path.getmtime(csv_path):
+            return None
+        
+        with pa.memory_map(sidecar_path, 'r') as source:
+            reader = pa.ipc.open_file(source)
+            
+            # Ignore sidecars written with a different column layout
+            metadata = reader.schema.metadata or {}
+            if metadata.get(_VERSION_KEY) != str(SIDECAR_CACHE_VERSION).encode():
+                logger.info(f"Ignoring Arrow cache {sidecar_path} from another cache version")
+                return None
+            
+            df = reader.read_all().to_pandas(split_blocks=True, self_destruct=True)
+        
+        logger.info(f"Loaded cached data from {sidecar_path}")
+        return df
+    except Exception as e:
+        logger.warning(f"Could not read Arrow cache {sidecar_path}: {str(e)}")
+        return None
+
+def write_sidecar(csv_path, df):
+    """
+    Write an Arrow IPC (Feather) sidecar next to a CSV file
+    
+    The sidecar is tagged with SIDECAR_CACHE_VERSION so that a change to
+    the parsed layout invalidates it. It is written to a temporary file and
+    renamed into place, so readers never map a half-written sidecar.
+    Failures are logged and ignored; the cache is only an optimization.
+    
+    Parameters:
+    -----------
+    csv_path : str
+        Path to the CSV file
+    df : pandas DataFrame
+        Data parsed from the CSV file
+    """
+    if not (CACHE_ENABLED and ARROW_AVAILABLE):
+        return
+    
+    sidecar_path = get_sidecar_path(csv_path)
+    temp_path = None
+    
+    try:
+        # Keep the pandas dtype metadata and add the cache version
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_VERSION_KEY] = str(SIDECAR_CACHE_VERSION).encode()
+        
+        # Write next to the sidecar (same filesystem), then atomically swap it in
+        fd, temp_path = tempfile.mkstemp(
+            prefix=os.path.basename(sidecar_path) + '.',
+            suffix='.tmp',
+            dir=os.path.dirname(sidecar_path) or '.'
+        )
+        os.close(fd)
+        feather.write_feather(table.replace_schema_metadata(metadata), temp_path, compression='lz4')
+        os.replace(temp_path, sidecar_path)
+        temp_path = None
+        
+        logger.info(f"Wrote Arrow cache to {sidecar_path}")
+    except Exception as e:
+        logger.warning(f"Could not write Arrow cache {sidecar_path}: {str(e)}")
+    finally:
+        # Don't leave a partial temporary file behind
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
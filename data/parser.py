@@ -2,10 +2,19 @@
 # Strong CSV parsing functions for GymViz
 
 import pandas as pd
+import numpy as np
 import os
 import re
 import logging
 from config.settings import CSV_SETTINGS, DEBUG
+from data.processor import get_unique_workouts
+
+# pyarrow is optional - with it pandas parses the CSV with Arrow's multithreaded reader
+try:
+    import pyarrow
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +23,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def downcast_numeric_columns(df):
+    """
+    Store set-level numeric columns in narrow dtypes
+    
+    Measurements become float32 and whole-number reps become int16, which
+    halves the memory moved by the dashboard's groupby reductions.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Data with numeric columns already coerced and NaN-filled
+        
+    Returns:
+    --------
+    pandas DataFrame
+        The same DataFrame with downcast columns
+    """
+    for col in ['Weight (kg)', 'RPE', 'Distance (meters)', 'Seconds', 'Duration (sec)']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='float')
+    
+    # Reps only go to int16 when every value is a whole number
+    if 'Reps' in df.columns:
+        reps = pd.to_numeric(df['Reps'], downcast='integer')
+        if pd.api.types.is_integer_dtype(reps) and reps.abs().max() <= np.iinfo(np.int16).max:
+            reps = reps.astype(np.int16)
+        df['Reps'] = reps
+    
+    return df
+
+def parse_workout_dates(values):
+    """
+    Parse Date strings with Strong's timestamp format
+    
+    Passing the known format skips pandas' per-call format inference and
+    parses every chunk the same way, like the timestamp_parsers given to the
+    pyarrow reader. Values in any other layout fall back to inference.
+    
+    Parameters:
+    -----------
+    values : pandas Series
+        Date strings
+        
+    Returns:
+    --------
+    pandas Series
+        datetime64 values
+    """
+    try:
+        return pd.to_datetime(values, format=CSV_SETTINGS['datetime_format'])
+    except (ValueError, TypeError):
+        return pd.to_datetime(values)
+
 def parse_strong_csv(file_path):
     """
     Parse a CSV export from the Strong app
@@ -22,12 +84,12 @@ def parse_strong_csv(file_path):
     -----------
     file_path : str or file-like object
         Path to the CSV file or uploaded file object
-    
+        
     Returns:
     --------
     pandas DataFrame
         Parsed DataFrame with workout data
-    
+        
     Raises:
     -------
     ValueError
@@ -39,10 +101,16 @@ def parse_strong_csv(file_path):
         # Handle both string paths and file objects
         if isinstance(file_path, str):
             logger.debug(f"Reading CSV from file path: {file_path}")
-            df = pd.read_csv(file_path, sep=CSV_SETTINGS['separator'], encoding=CSV_SETTINGS['encoding'])
         else:
             logger.debug(f"Reading CSV from file object")
-            df = pd.read_csv(file_path, sep=CSV_SETTINGS['separator'], encoding=CSV_SETTINGS['encoding'])
+        
+        # The pyarrow engine also types ISO timestamps (Date) while reading
+        df = pd.read_csv(
+            file_path,
+            sep=CSV_SETTINGS['separator'],
+            encoding=CSV_SETTINGS['encoding'],
+            engine=CSV_ENGINE
+        )
         
         # Clean column names by removing quotes if they exist
         df.columns = [col.replace('"', '') for col in df.columns]
@@ -62,9 +130,10 @@ def parse_strong_csv(file_path):
             logger.error(f"Missing required columns: {', '.join(missing)}")
             raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
         
-        # Convert date column to datetime
+        # Convert date column to datetime (unless the reader already did)
         try:
-            df['Date'] = pd.to_datetime(df['Date'])
+            if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+                df['Date'] = parse_workout_dates(df['Date'])
             logger.debug(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
         except Exception as e:
             logger.error(f"Error converting Date column to datetime: {str(e)}")
@@ -86,8 +155,9 @@ def parse_strong_csv(file_path):
                 except Exception as e:
                     logger.warning(f"Error converting {col} to numeric: {str(e)}")
         
-        # Calculate volume (weight × reps)
-        df['Volume'] = df['Weight (kg)'] * df['Reps']
+        # Narrow the numeric columns, then calculate volume (weight × reps) in float32
+        downcast_numeric_columns(df)
+        df['Volume'] = df['Weight (kg)'].to_numpy(np.float32) * df['Reps'].to_numpy(np.float32)
         
         # Check for and handle case where set order is not numeric
         if 'Set Order' in df.columns:
@@ -101,12 +171,13 @@ def parse_strong_csv(file_path):
         if '_id' not in df.columns:
             df['_id'] = range(1, len(df) + 1)
         
-        # Log summary statistics
-        logger.info(f"Parsed {len(df)} sets across {df['Workout Name'].nunique()} workouts")
-        logger.info(f"Found {df['Exercise Name'].nunique()} unique exercises")
+        # Log summary statistics (the distinct counts are only computed when they will be shown)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Parsed {len(df)} sets across {df['Workout Name'].nunique()} workouts")
+            logger.info(f"Found {df['Exercise Name'].nunique()} unique exercises")
         
         return df
-        
+    
     except pd.errors.ParserError as e:
         logger.error(f"CSV parsing error: {str(e)}")
         raise ValueError(f"Failed to parse CSV file: {str(e)}")
@@ -123,7 +194,7 @@ def validate_strong_csv(df):
     -----------
     df : pandas DataFrame
         DataFrame to validate
-    
+        
     Returns:
     --------
     bool
@@ -165,7 +236,7 @@ def extract_csv_metadata(df):
     -----------
     df : pandas DataFrame
         Parsed Strong CSV data
-    
+        
     Returns:
     --------
     dict
@@ -173,39 +244,50 @@ def extract_csv_metadata(df):
     """
     metadata = {}
     
-    # Date range
+    # Date range (each bound scanned once)
+    start_date = df['Date'].min()
+    end_date = df['Date'].max()
     metadata['date_range'] = {
-        'start': df['Date'].min(),
-        'end': df['Date'].max(),
-        'days': (df['Date'].max() - df['Date'].min()).days + 1
+        'start': start_date,
+        'end': end_date,
+        'days': (end_date - start_date).days + 1
     }
     
     # Workout stats
-    workout_dates = df[['Date', 'Workout Name']].drop_duplicates()
+    workout_dates = get_unique_workouts(df)
     metadata['workouts'] = {
         'count': len(workout_dates),
         'avg_per_week': len(workout_dates) / (metadata['date_range']['days'] / 7) if metadata['date_range']['days'] > 0 else 0,
         'names': df['Workout Name'].unique().tolist()
     }
     
-    # Exercise stats
+    # Exercise stats (one hash pass; the count skips missing names like nunique)
+    exercise_names = df['Exercise Name'].unique()
     metadata['exercises'] = {
-        'count': df['Exercise Name'].nunique(),
-        'names': df['Exercise Name'].unique().tolist()
+        'count': int(pd.notna(exercise_names).sum()),
+        'names': exercise_names.tolist()
     }
     
+    # Per-workout totals in one grouped pass (duration is the same for all sets in a workout)
+    has_duration = 'Duration (sec)' in df.columns and not df['Duration (sec)'].isna().all()
+    workout_aggregations = {'Volume': 'sum'}
+    if has_duration:
+        workout_aggregations['Duration (sec)'] = 'first'
+    per_workout = df.groupby(['Date', 'Workout Name'], observed=True, sort=False).agg(workout_aggregations)
+    
     # Volume stats
     metadata['volume'] = {
         'total': df['Volume'].sum(),
-        'avg_per_workout': df.groupby(['Date', 'Workout Name'])['Volume'].sum().mean()
+        'avg_per_workout': per_workout['Volume'].mean()
     }
     
-    # Weight stats
-    non_zero_weights = df[df['Weight (kg)'] > 0]
+    # Weight stats (filter the column, not the whole frame)
+    weights = df['Weight (kg)']
+    non_zero_weights = weights[weights > 0]
     if not non_zero_weights.empty:
         metadata['weight'] = {
-            'max': non_zero_weights['Weight (kg)'].max(),
-            'avg': non_zero_weights['Weight (kg)'].mean()
+            'max': non_zero_weights.max(),
+            'avg': non_zero_weights.mean()
         }
     else:
         metadata['weight'] = {
@@ -214,11 +296,12 @@ def extract_csv_metadata(df):
         }
     
     # Rep stats
-    non_zero_reps = df[df['Reps'] > 0]
+    reps = df['Reps']
+    non_zero_reps = reps[reps > 0]
     if not non_zero_reps.empty:
         metadata['reps'] = {
-            'max': non_zero_reps['Reps'].max(),
-            'avg': non_zero_reps['Reps'].mean()
+            'max': non_zero_reps.max(),
+            'avg': non_zero_reps.mean()
         }
     else:
         metadata['reps'] = {
@@ -228,11 +311,12 @@ def extract_csv_metadata(df):
     
     # Check if RPE data is available
     if 'RPE' in df.columns and not df['RPE'].isna().all():
-        non_zero_rpe = df[df['RPE'] > 0]
+        rpe = df['RPE']
+        non_zero_rpe = rpe[rpe > 0]
         if not non_zero_rpe.empty:
             metadata['rpe'] = {
                 'available': True,
-                'avg': non_zero_rpe['RPE'].mean()
+                'avg': non_zero_rpe.mean()
             }
         else:
             metadata['rpe'] = {'available': False}
@@ -240,12 +324,10 @@ def extract_csv_metadata(df):
         metadata['rpe'] = {'available': False}
     
     # Check if duration data is available
-    if 'Duration (sec)' in df.columns and not df['Duration (sec)'].isna().all():
-        non_zero_duration = df[df['Duration (sec)'] > 0]
-        if not non_zero_duration.empty:
+    if has_duration:
+        if (df['Duration (sec)'] > 0).any():
             # Get average workout duration in minutes
-            unique_workouts = df.drop_duplicates(subset=['Date', 'Workout Name'])
-            avg_duration = unique_workouts['Duration (sec)'].mean() / 60
+            avg_duration = per_workout['Duration (sec)'].mean() / 60
             metadata['duration'] = {
                 'available': True,
                 'avg_minutes': avg_duration
@@ -267,7 +349,7 @@ def export_to_csv(df, file_path):
         Processed data to export
     file_path : str
         Path to save the CSV file
-    
+        
     Returns:
     --------
     bool
@@ -4,10 +4,19 @@
 import pandas as pd
 import numpy as np
 import logging
+from functools import lru_cache
 from datetime import datetime, timedelta
 
-from config.settings import DEBUG
+from config.settings import DEBUG, CATEGORY_COLUMNS, WEEKDAY_NAMES
 from config.mappings import map_exercise_to_muscle_group
+from utils.date_utils import day_range_mask, format_dates
+
+# Numba is optional - without it PR detection uses grouped pandas scans
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +25,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns carried over into the unique-workouts frame when present
+WORKOUT_COLUMNS = ['Date', 'Workout Name', 'Duration (sec)', 'Duration (min)',
+                   'Weekday', 'YearMonth', 'YearWeek', 'Year']
+
+# Per-type PR flags set by identify_personal_records ('Is Any PR' combines them)
+PR_TYPE_COLUMNS = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR']
+
+# Muscle groups that mark a workout as push or pull in segment_workouts_by_type
+PUSH_MUSCLE_GROUPS = frozenset({'Chest', 'Shoulders', 'Triceps', 'Arms'})
+PULL_MUSCLE_GROUPS = frozenset({'Back', 'Biceps', 'Arms'})
+
 def preprocess_data(df):
     """
     Preprocess data from a parsed Strong CSV DataFrame
@@ -24,7 +44,7 @@ def preprocess_data(df):
     -----------
     df : pandas DataFrame
         Parsed Strong CSV data
-    
+        
     Returns:
     --------
     pandas DataFrame
@@ -32,29 +52,38 @@ def preprocess_data(df):
     """
     logger.info("Starting data preprocessing")
     
-    # Create a copy to avoid modifying the original
-    processed_df = df.copy()
+    # Shallow copy: new columns never reach the original, and no column data is copied
+    processed_df = df.copy(deep=False)
     
-    # Map exercises to muscle groups
-    processed_df['Muscle Group'] = processed_df['Exercise Name'].apply(map_exercise_to_muscle_group)
+    # Map exercises to muscle groups, classifying each distinct name once
+    exercise_names = processed_df['Exercise Name']
+    muscle_lookup = {name: map_exercise_to_muscle_group(name) for name in exercise_names.unique()}
+    processed_df['Muscle Group'] = exercise_names.map(muscle_lookup)
     logger.debug(f"Mapped exercises to muscle groups")
     
     # Generate date-related features
     processed_df['Year'] = processed_df['Date'].dt.year
     processed_df['Month'] = processed_df['Date'].dt.month
-    processed_df['MonthName'] = processed_df['Date'].dt.month_name()
+    processed_df['MonthName'] = format_dates(processed_df['Date'], '%B')
     processed_df['Day'] = processed_df['Date'].dt.day
-    processed_df['Weekday'] = processed_df['Date'].dt.day_name()
+    processed_df['Weekday'] = pd.Categorical.from_codes(
+        processed_df['Date'].dt.dayofweek, categories=WEEKDAY_NAMES, ordered=True
+    )
     processed_df['Week'] = processed_df['Date'].dt.isocalendar().week
-    processed_df['YearWeek'] = processed_df['Date'].dt.strftime('%Y-%U')
-    processed_df['YearMonth'] = processed_df['Date'].dt.strftime('%Y-%m')
+    processed_df['YearWeek'] = format_dates(processed_df['Date'], '%Y-%U')
+    processed_df['YearMonth'] = format_dates(processed_df['Date'], '%Y-%m')
     
     logger.debug(f"Added date-related features")
     
-    # Calculate 1RM using Brzycki formula
-    processed_df['1RM'] = processed_df.apply(
-        lambda row: calculate_1rm(row['Weight (kg)'], row['Reps']), 
-        axis=1
+    # Calculate 1RM using Brzycki formula, with the same cases as calculate_1rm
+    weight = processed_df['Weight (kg)'].to_numpy(dtype=float)
+    reps = processed_df['Reps'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        brzycki = weight * (36 / (37 - reps))
+    processed_df['1RM'] = np.select(
+        [(reps <= 0) | (weight <= 0), reps > 36],
+        [0.0, weight * 1.1],
+        brzycki
     )
     logger.debug(f"Calculated estimated 1RM values")
     
@@ -72,16 +101,13 @@ def preprocess_data(df):
     # Calculate workout density if duration is available
     if 'Duration (sec)' in processed_df.columns and not processed_df['Duration (sec)'].isna().all():
         # Group by date and workout name
-        workout_df = processed_df.groupby(['Date', 'Workout Name']).agg({
+        workout_df = processed_df.groupby(['Date', 'Workout Name'], observed=True, sort=False, as_index=False).agg({
             'Duration (sec)': 'first',  # Assuming duration is the same for all sets in a workout
             'Volume': 'sum'
-        }).reset_index()
+        })
         
         # Calculate density (volume per minute)
-        workout_df['Density'] = workout_df.apply(
-            lambda row: row['Volume'] / (row['Duration (sec)'] / 60) if row['Duration (sec)'] > 0 else 0,
-            axis=1
-        )
+        workout_df['Density'] = calculate_density(workout_df['Volume'], workout_df['Duration (sec)'])
         
         # Merge back into the main DataFrame
         processed_df = pd.merge(
@@ -94,23 +120,20 @@ def preprocess_data(df):
         logger.debug(f"Calculated workout density (volume per minute)")
     
     # Calculate set order within each exercise if not already present
-    if not processed_df['Set Order'].equals(processed_df.groupby(['Date', 'Exercise Name']).cumcount() + 1):
+    if not processed_df['Set Order'].equals(processed_df.groupby(['Date', 'Exercise Name'], observed=True, sort=False).cumcount() + 1):
         # Create a new set order that's consistent and sequential
-        processed_df['Set Order'] = processed_df.groupby(['Date', 'Workout Name', 'Exercise Name']).cumcount() + 1
+        processed_df['Set Order'] = processed_df.groupby(['Date', 'Workout Name', 'Exercise Name'], observed=True, sort=False).cumcount() + 1
         logger.debug(f"Recalculated set order within each exercise")
     
     # Calculate rest days between workouts
-    workout_dates = sorted(processed_df['Date'].dt.date.unique())
+    workout_days, day_index = np.unique(processed_df['Date'].to_numpy(dtype='datetime64[D]'), return_inverse=True)
     
-    if len(workout_dates) > 1:
-        # Create a mapping from date to rest days before next workout
-        rest_days_map = {}
-        for i in range(len(workout_dates) - 1):
-            days_diff = (workout_dates[i+1] - workout_dates[i]).days - 1
-            rest_days_map[workout_dates[i]] = days_diff
+    if len(workout_days) > 1:
+        # Rest days before the next workout day (none after the last one)
+        rest_days = np.append(np.diff(workout_days).astype('int64') - 1, np.nan)
         
         # Add rest days column
-        processed_df['Rest Days After'] = processed_df['Date'].dt.date.map(rest_days_map)
+        processed_df['Rest Days After'] = rest_days[day_index]
         logger.debug(f"Calculated rest days between workouts")
     
     # Calculate if this is a PR (1RM, weight, or volume) for each exercise
@@ -119,14 +142,40 @@ def preprocess_data(df):
     logger.debug(f"Identified personal records")
     
     # Calculate workout_id for uniquely identifying workouts
-    processed_df['workout_id'] = processed_df['Date'].dt.strftime('%Y%m%d') + '_' + \
+    processed_df['workout_id'] = format_dates(processed_df['Date'], '%Y%m%d') + '_' + \
                                 processed_df['Workout Name'].str.replace(' ', '_')
     logger.debug(f"Added workout_id for uniquely identifying workouts")
     
+    # Store the low-cardinality labels as categories
+    for col in CATEGORY_COLUMNS:
+        if col in processed_df.columns:
+            processed_df[col] = processed_df[col].astype('category')
+    
     logger.info(f"Data preprocessing complete: {len(processed_df)} rows with enhanced features")
     
     return processed_df
 
+def calculate_density(volume, duration_sec):
+    """
+    Calculate workout density (volume per minute)
+    
+    Parameters:
+    -----------
+    volume : pandas Series
+        Total volume of each workout
+    duration_sec : pandas Series
+        Duration of each workout in seconds
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Volume per minute as float64, 0 where the duration is missing or zero
+    """
+    minutes = duration_sec.to_numpy(dtype=float) / 60
+    
+    # Divide only where there is a duration
+    return np.divide(volume.to_numpy(dtype=float), minutes, out=np.zeros(len(minutes)), where=minutes > 0)
+
 def calculate_1rm(weight, reps):
     """
     Calculates estimated 1 rep max using Brzycki formula
@@ -155,6 +204,41 @@ def calculate_1rm(weight, reps):
     # Brzycki formula
     return weight * (36 / (37 - reps))
 
+def _pr_scan(codes, values):
+    """
+    Flag values that beat every earlier value with the same code
+    
+    Parameters:
+    -----------
+    codes : numpy.ndarray
+        Integer exercise codes (-1 for missing), grouped and in date order
+    values : numpy.ndarray
+        float64 values to scan
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean PR flags
+    """
+    best = np.zeros(codes.max() + 1 if len(codes) else 0)
+    flags = np.zeros(len(codes), dtype=np.bool_)
+    
+    for i in range(len(codes)):
+        code = codes[i]
+        if code < 0:
+            # Sets without an exercise name are never PRs
+            continue
+        
+        # Running best starts at 0, so only positive values can be PRs
+        if values[i] > best[code]:
+            flags[i] = True
+            best[code] = values[i]
+    
+    return flags
+
+if NUMBA_AVAILABLE:
+    _pr_scan = njit(cache=True)(_pr_scan)
+
 def identify_personal_records(df):
     """
     Identify personal records in the dataset
@@ -163,65 +247,45 @@ def identify_personal_records(df):
     -----------
     df : pandas DataFrame
         Preprocessed DataFrame
-    
+        
     Returns:
     --------
     pandas DataFrame
         DataFrame with PR indicators
     """
-    result_df = df.copy()
-    
-    # Initialize PR columns
-    result_df['Is Weight PR'] = False
-    result_df['Is Reps PR'] = False
-    result_df['Is Volume PR'] = False
-    result_df['Is 1RM PR'] = False
-    
-    # Process each exercise separately
-    for exercise_name, exercise_df in result_df.groupby('Exercise Name'):
-        # Sort by date
-        exercise_df = exercise_df.sort_values('Date')
-        
-        # Track maximum values seen so far
-        max_weight = 0
-        max_reps = 0
-        max_volume = 0
-        max_1rm = 0
-        
-        # Indices to update
-        weight_pr_indices = []
-        reps_pr_indices = []
-        volume_pr_indices = []
-        orm_pr_indices = []
-        
-        # Check each set
-        for idx, row in exercise_df.iterrows():
-            # Check weight PR
-            if row['Weight (kg)'] > max_weight and row['Weight (kg)'] > 0:
-                max_weight = row['Weight (kg)']
-                weight_pr_indices.append(idx)
-            
-            # Check reps PR
-            if row['Reps'] > max_reps and row['Reps'] > 0:
-                max_reps = row['Reps']
-                reps_pr_indices.append(idx)
+    # Shallow copy: only new flag columns are added
+    result_df = df.copy(deep=False)
+    
+    # Walk each exercise in date order (stable, so sets keep their order within a workout);
+    # sorting by exercise first keeps every group contiguous for the grouped scans below
+    ordered = result_df.sort_values(['Exercise Name', 'Date'], kind='mergesort')
+    exercise_key = ordered['Exercise Name']
+    
+    pr_columns = {
+        'Is Weight PR': 'Weight (kg)',
+        'Is Reps PR': 'Reps',
+        'Is Volume PR': 'Volume',
+        'Is 1RM PR': '1RM'
+    }
+    
+    if NUMBA_AVAILABLE:
+        # One compiled sweep per PR type over integer exercise codes
+        codes = pd.factorize(exercise_key)[0]
+        for pr_col, value_col in pr_columns.items():
+            flags = _pr_scan(codes, ordered[value_col].to_numpy(dtype=np.float64))
+            result_df[pr_col] = pd.Series(flags, index=ordered.index)
+    else:
+        for pr_col, value_col in pr_columns.items():
+            values = ordered[value_col]
             
-            # Check volume PR
-            volume = row['Volume']
-            if volume > max_volume and volume > 0:
-                max_volume = volume
-                volume_pr_indices.append(idx)
+            # Best value seen before each set (running max starts at 0)
+            running_max = values.groupby(exercise_key, observed=True, sort=False).cummax()
+            previous_best = running_max.groupby(exercise_key, observed=True, sort=False).shift(1)
+            previous_best = previous_best.groupby(exercise_key, observed=True, sort=False).ffill().fillna(0).clip(lower=0)
             
-            # Check 1RM PR
-            if row['1RM'] > max_1rm and row['1RM'] > 0:
-                max_1rm = row['1RM']
-                orm_pr_indices.append(idx)
-        
-        # Update PR flags in the result DataFrame
-        result_df.loc[weight_pr_indices, 'Is Weight PR'] = True
-        result_df.loc[reps_pr_indices, 'Is Reps PR'] = True
-        result_df.loc[volume_pr_indices, 'Is Volume PR'] = True
-        result_df.loc[orm_pr_indices, 'Is 1RM PR'] = True
+            # A set is a PR when it strictly beats everything before it;
+            # sets without an exercise name have no history and are never PRs
+            result_df[pr_col] = (values > previous_best) & (values > 0) & exercise_key.notna()
     
     # Add Any PR column
     result_df['Is Any PR'] = (
@@ -233,6 +297,80 @@ def identify_personal_records(df):
     
     return result_df
 
+def get_pr_mask(df):
+    """
+    Get a boolean mask of the sets that set any kind of personal record
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Workout data with PR columns from identify_personal_records
+        
+    Returns:
+    --------
+    pandas Series or None
+        True for PR sets, or None if df has no PR columns
+    """
+    if 'Is Any PR' in df.columns:
+        return df['Is Any PR']
+    
+    # Combine whichever individual PR flags are present
+    available_pr_columns = [col for col in PR_TYPE_COLUMNS if col in df.columns]
+    if not available_pr_columns:
+        return None
+    
+    return df[available_pr_columns].any(axis=1)
+
+def count_personal_records(df):
+    """
+    Count the sets that set any kind of personal record
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Workout data with PR columns from identify_personal_records
+        
+    Returns:
+    --------
+    int
+        Number of PR sets (0 if df has no PR columns)
+    """
+    mask = get_pr_mask(df)
+    return 0 if mask is None else int(mask.sum())
+
+def rolling_mean(values, window=3):
+    """
+    Trailing rolling mean, equivalent to Series.rolling(window, min_periods=1).mean()
+    
+    Computed from cumulative sums, which avoids building a pandas Rolling
+    object for the short per-period series the charts smooth.
+    
+    Parameters:
+    -----------
+    values : array-like
+        Values to smooth (NaN values are skipped)
+    window : int
+        Window length
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Mean of the last `window` non-NaN values at each position
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    
+    # Window sums and counts as differences of prefix sums
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    
+    window_sums = sums[end] - sums[start]
+    window_counts = counts[end] - counts[start]
+    
+    return np.where(window_counts > 0, window_sums / np.maximum(window_counts, 1), np.nan)
+
 def calculate_progression_metrics(df, exercise_name=None, muscle_group=None, period='month'):
     """
     Calculate progression metrics for exercises or muscle groups
@@ -255,7 +393,7 @@ def calculate_progression_metrics(df, exercise_name=None, muscle_group=None, per
     """
     # Filter data if needed
     if exercise_name:
-        filtered_df = df[df['Exercise Name'] == exercise_name].copy()
+        filtered_df = get_exercise_rows(df, exercise_name)
     elif muscle_group:
         filtered_df = df[df['Muscle Group'] == muscle_group].copy()
     else:
@@ -276,34 +414,34 @@ def calculate_progression_metrics(df, exercise_name=None, muscle_group=None, per
     # Group by period
     if exercise_name:
         # For a specific exercise
-        progression = filtered_df.groupby(period_col).agg({
+        progression = filtered_df.groupby(period_col, as_index=False).agg({
             'Weight (kg)': 'max',
             'Reps': 'max',
             'Volume': 'sum',
             '1RM': 'max'
-        }).reset_index()
+        })
     else:
         # For muscle group or all exercises
-        progression = filtered_df.groupby([period_col, 'Exercise Name']).agg({
+        progression = filtered_df.groupby([period_col, 'Exercise Name'], observed=True, as_index=False).agg({
             'Weight (kg)': 'max',
             'Reps': 'max',
             'Volume': 'sum',
             '1RM': 'max'
-        }).reset_index()
+        })
         
         # Aggregate across exercises
-        progression = progression.groupby(period_col).agg({
+        progression = progression.groupby(period_col, as_index=False).agg({
             'Weight (kg)': 'mean',  # Average max weight across exercises
             'Reps': 'mean',  # Average max reps across exercises
             'Volume': 'sum',  # Total volume
             '1RM': 'mean'  # Average 1RM across exercises
-        }).reset_index()
+        })
     
     # Calculate rolling averages and percent changes
     if len(progression) > 1:
         # Calculate rolling averages (3 periods)
         for col in ['Weight (kg)', 'Volume', '1RM']:
-            progression[f'{col} Rolling Avg'] = progression[col].rolling(window=3, min_periods=1).mean()
+            progression[f'{col} Rolling Avg'] = rolling_mean(progression[col], window=3)
         
         # Calculate percent changes from first to last period
         first_values = progression.iloc[0]
@@ -346,29 +484,21 @@ def calculate_intensity_metrics(df):
             metrics['avg_rpe'] = rpe_data['RPE'].mean()
             
             # Average RPE by muscle group
-            metrics['rpe_by_muscle'] = rpe_data.groupby('Muscle Group')['RPE'].mean().to_dict()
+            metrics['rpe_by_muscle'] = rpe_data.groupby('Muscle Group', observed=True)['RPE'].mean().to_dict()
             
             # Average RPE by exercise (top 5 highest)
-            exercise_rpe = rpe_data.groupby('Exercise Name')['RPE'].mean().sort_values(ascending=False)
+            exercise_rpe = rpe_data.groupby('Exercise Name', observed=True, sort=False)['RPE'].mean().sort_values(ascending=False)
             metrics['highest_rpe_exercises'] = exercise_rpe.head(5).to_dict()
     
     # Calculate average intensity based on percentage of 1RM
-    # First, calculate 1RM for each exercise
-    exercise_1rms = {}
-    
-    for exercise, ex_df in df.groupby('Exercise Name'):
-        max_1rm = ex_df['1RM'].max()
-        if max_1rm > 0:
-            exercise_1rms[exercise] = max_1rm
+    # First, broadcast each exercise's best 1RM to its sets
+    exercise_1rm = df.groupby('Exercise Name', observed=True, sort=False)['1RM'].transform('max').to_numpy(dtype=float)
+    has_1rm = exercise_1rm > 0
     
     # Now calculate what percentage of 1RM each set was performed at
-    if exercise_1rms:
-        df['Percent of 1RM'] = df.apply(
-            lambda row: (row['Weight (kg)'] / exercise_1rms.get(row['Exercise Name'], 1)) * 100 
-            if row['Exercise Name'] in exercise_1rms and exercise_1rms[row['Exercise Name']] > 0 
-            else 0,
-            axis=1
-        )
+    if has_1rm.any():
+        weights = df['Weight (kg)'].to_numpy(dtype=float)
+        df['Percent of 1RM'] = np.divide(weights, exercise_1rm, out=np.zeros(len(df)), where=has_1rm) * 100
         
         # Average intensity
         intensity_data = df[df['Percent of 1RM'] > 0]
@@ -376,26 +506,19 @@ def calculate_intensity_metrics(df):
             metrics['avg_intensity'] = intensity_data['Percent of 1RM'].mean()
             
             # Intensity by muscle group
-            metrics['intensity_by_muscle'] = intensity_data.groupby('Muscle Group')['Percent of 1RM'].mean().to_dict()
+            metrics['intensity_by_muscle'] = intensity_data.groupby('Muscle Group', observed=True)['Percent of 1RM'].mean().to_dict()
     
     # Calculate volume distribution by rep range
-    # Categorize sets into rep ranges
-    def rep_range(reps):
-        if reps <= 5:
-            return 'Strength (1-5)'
-        elif reps <= 8:
-            return 'Hypertrophy-Strength (6-8)'
-        elif reps <= 12:
-            return 'Hypertrophy (9-12)'
-        elif reps <= 15:
-            return 'Hypertrophy-Endurance (13-15)'
-        else:
-            return 'Endurance (16+)'
-    
-    df['Rep Range'] = df['Reps'].apply(rep_range)
+    # Categorize sets into rep ranges (anything above 15 or missing is endurance)
+    reps = df['Reps'].to_numpy(dtype=float)
+    df['Rep Range'] = np.select(
+        [reps <= 5, reps <= 8, reps <= 12, reps <= 15],
+        ['Strength (1-5)', 'Hypertrophy-Strength (6-8)', 'Hypertrophy (9-12)', 'Hypertrophy-Endurance (13-15)'],
+        default='Endurance (16+)'
+    )
     
     # Calculate volume by rep range
-    volume_by_range = df.groupby('Rep Range')['Volume'].sum()
+    volume_by_range = df.groupby('Rep Range', observed=True)['Volume'].sum()
     total_volume = volume_by_range.sum()
     
     if total_volume > 0:
@@ -403,6 +526,34 @@ def calculate_intensity_metrics(df):
     
     return metrics
 
+def _plateau_runs(weights, window):
+    """
+    Find runs of days that do not beat the best weight so far
+    
+    A new run starts whenever a day's weight beats every earlier day, and
+    lasts until the next such day.
+    
+    Parameters:
+    -----------
+    weights : numpy.ndarray
+        Max weight per day, in date order
+    window : int
+        Minimum run length (in days) to report
+        
+    Returns:
+    --------
+    tuple
+        (starts, ends, lengths) arrays of the runs of at least window days;
+        starts and ends are inclusive positions in weights
+    """
+    running_max = np.maximum.accumulate(weights)
+    starts = np.flatnonzero(np.r_[True, weights[1:] > running_max[:-1]])
+    ends = np.r_[starts[1:], len(weights)] - 1
+    lengths = ends - starts + 1
+    
+    keep = lengths >= window
+    return starts[keep], ends[keep], lengths[keep]
+
 def identify_plateaus(df, exercise_name, window=5):
     """
     Detect plateaus in progress for a specific exercise
@@ -422,56 +573,214 @@ def identify_plateaus(df, exercise_name, window=5):
         List of plateau periods
     """
     # Filter for the specific exercise
-    exercise_df = df[df['Exercise Name'] == exercise_name].copy()
+    exercise_df = get_exercise_rows(df, exercise_name)
     
     if len(exercise_df) < window:
         return []
     
-    # Sort by date
-    exercise_df = exercise_df.sort_values('Date')
+    # Group by date (sorted) and calculate max weight
+    grouped = exercise_df.groupby('Date', as_index=False)['Weight (kg)'].max()
+    weights = grouped['Weight (kg)'].to_numpy()
+    dates = grouped['Date']
+    
+    # Only the plateau runs reach Python; the weight is the run's first weight
+    starts, ends, lengths = _plateau_runs(weights, window)
+    
+    return [
+        {
+            'start_date': dates.iloc[start] if length > 1 else None,
+            'end_date': dates.iloc[end],
+            'duration': int(length),
+            'weight': weights[start]
+        }
+        for start, end, length in zip(starts, ends, lengths)
+    ]
+
+def _first_workout_rows(df):
+    """
+    Get the first row of each Date / Workout Name pair
+    
+    Date-ordered data (as produced by the dashboard loader) is split into
+    runs by comparing neighbouring rows, which avoids hashing every row.
+    If the order cannot guarantee unique pairs, drop_duplicates is used.
     
-    # Group by date and calculate max weight
-    grouped = exercise_df.groupby('Date')['Weight (kg)'].max().reset_index()
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Set-level workout data
+        
+    Returns:
+    --------
+    pandas DataFrame
+        First row of each workout, in the order of df
+    """
+    if len(df) > 1 and df['Date'].is_monotonic_increasing:
+        dates = df['Date'].to_numpy()
+        names = df['Workout Name']
+        names = names.cat.codes.to_numpy() if isinstance(names.dtype, pd.CategoricalDtype) else names.to_numpy()
+        
+        same_date = dates[1:] == dates[:-1]
+        same_name = names[1:] == names[:-1]
+        
+        # Each date then holds exactly one workout, so a new date starts a new workout
+        if not (same_date & ~same_name).any():
+            return df[np.r_[True, ~same_date]]
     
-    # Check for plateaus
-    plateaus = []
-    plateau_start = None
-    current_weight = grouped['Weight (kg)'].iloc[0]
-    same_weight_count = 1
+    return df.drop_duplicates(subset=['Date', 'Workout Name'])
+
+def get_unique_workouts(df):
+    """
+    Get one row per workout (unique Date / Workout Name pair)
     
-    for i in range(1, len(grouped)):
-        weight = grouped['Weight (kg)'].iloc[i]
-        date = grouped['Date'].iloc[i]
+    The result is a slice of df, so treat it as read-only.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Set-level workout data
         
-        # If weight is the same (or lower)
-        if weight <= current_weight:
-            if plateau_start is None:
-                plateau_start = grouped['Date'].iloc[i-1]
-            same_weight_count += 1
-        else:
-            # If we found a plateau and now weight increased
-            if same_weight_count >= window:
-                plateaus.append({
-                    'start_date': plateau_start,
-                    'end_date': grouped['Date'].iloc[i-1],
-                    'duration': same_weight_count,
-                    'weight': current_weight
-                })
-            
-            plateau_start = None
-            same_weight_count = 1
-            current_weight = weight
-    
-    # Check if we ended on a plateau
-    if same_weight_count >= window:
-        plateaus.append({
-            'start_date': plateau_start,
-            'end_date': grouped['Date'].iloc[-1],
-            'duration': same_weight_count,
-            'weight': current_weight
-        })
+    Returns:
+    --------
+    pandas DataFrame
+        Unique workouts with the workout-level columns of df
+    """
+    columns = [col for col in WORKOUT_COLUMNS if col in df.columns]
     
-    return plateaus
+    return _first_workout_rows(df)[columns]
+
+def get_exercise_muscle_groups(df):
+    """
+    Map each exercise to the muscle group of its first set
+    
+    Build it once before looping over exercises, so each lookup is an index
+    access instead of a scan of the exercise's rows.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        DataFrame with 'Exercise Name' and 'Muscle Group' columns
+        
+    Returns:
+    --------
+    pandas Series
+        Muscle group indexed by exercise name
+    """
+    return (df[['Exercise Name', 'Muscle Group']].drop_duplicates('Exercise Name')
+              .set_index('Exercise Name')['Muscle Group'])
+
+def get_exercise_indices(df):
+    """
+    Map each exercise to the positions of its rows in one grouped pass
+    
+    Build it once before looping over exercises and pass it to
+    get_exercise_rows, which then skips its own scan of the names.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Set-level workout data
+        
+    Returns:
+    --------
+    dict
+        Row positions (numpy arrays) keyed by exercise name
+    """
+    return df.groupby('Exercise Name', observed=True, sort=False).indices
+
+def get_exercise_rows(df, exercise_name, columns=None, indices=None):
+    """
+    Get the sets of one exercise as a gather of its row positions
+    
+    Loops over many exercises should pass the index from get_exercise_indices
+    so the lookup is a dict access instead of a full equality scan. The result
+    is a new frame (not a view of df), so it can be modified without a
+    defensive copy.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Set-level workout data
+    exercise_name : str
+        Exercise to select
+    columns : list, optional
+        Columns to gather; names missing from df are skipped. All columns if None.
+    indices : dict, optional
+        Index from get_exercise_indices(df); df is scanned if None
+        
+    Returns:
+    --------
+    pandas DataFrame
+        Rows for the exercise, in their original order
+    """
+    if indices is None:
+        positions = np.flatnonzero((df['Exercise Name'] == exercise_name).to_numpy())
+    else:
+        positions = indices.get(exercise_name, np.array([], dtype=np.intp))
+    
+    # Gather only the requested columns
+    if columns is None:
+        return df.take(positions)
+    
+    return df.iloc[positions, df.columns.get_indexer([col for col in columns if col in df.columns])]
+
+def get_first_last_sets(df):
+    """
+    Get the first and last set of every exercise in one pass
+    
+    Rows are taken in date order (stable, so sets within a workout keep
+    their order); sets without an exercise name are ignored.
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Set-level workout data
+        
+    Returns:
+    --------
+    tuple
+        (first, last, counts): first and last set DataFrames indexed by
+        exercise name in order of first appearance, and the aligned number
+        of sets per exercise
+    """
+    ordered = df if df['Date'].is_monotonic_increasing else df.sort_values('Date', kind='mergesort')
+    named = ordered[ordered['Exercise Name'].notna()]
+    
+    first = named.drop_duplicates('Exercise Name').set_index('Exercise Name')
+    last = named.drop_duplicates('Exercise Name', keep='last').set_index('Exercise Name').reindex(first.index)
+    counts = named['Exercise Name'].value_counts(sort=False).reindex(first.index)
+    
+    return first, last, counts
+
+def get_sorted_values(df, column):
+    """
+    Get the sorted distinct non-null values of a column, e.g. for a selectbox
+    
+    For a categorical column the codes in use are looked up in its categories,
+    which are already sorted when created with astype('category').
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Workout data
+    column : str
+        Column name (e.g. 'Exercise Name')
+        
+    Returns:
+    --------
+    list
+        Sorted distinct non-null values
+    """
+    values = df[column]
+    
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Flag the codes in use; the extra last slot absorbs the -1 code of nulls
+        categories = values.cat.categories
+        used = np.zeros(len(categories) + 1, dtype=bool)
+        used[values.cat.codes.to_numpy()] = True
+        in_use = categories[used[:-1]]
+        return in_use.tolist() if in_use.is_monotonic_increasing else sorted(in_use)
+    
+    return sorted(values.dropna().unique())
 
 def segment_workouts_by_type(df):
     """
@@ -488,26 +797,37 @@ def segment_workouts_by_type(df):
         Dictionary with workout type classifications
     """
     # Get unique workouts
-    workouts = df[['Date', 'Workout Name']].drop_duplicates()
+    workouts = get_unique_workouts(df)
+    
+    # Per-workout totals, computed once for all workouts
+    by_workout = df.groupby(['Date', 'Workout Name'], observed=True, sort=False)
+    workout_sets = by_workout.size().to_dict()
+    workout_positions = by_workout.indices
+    volumes = df['Volume'].to_numpy()
+    workout_exercises = by_workout['Exercise Name'].unique().to_dict()
+    
+    # Sets per muscle group of each workout, in order of appearance
+    workout_muscle_sets = {}
+    muscle_sets = df.groupby(['Date', 'Workout Name', 'Muscle Group'], observed=True, sort=False).size()
+    for (date, workout_name, muscle_group), sets in muscle_sets.items():
+        workout_muscle_sets.setdefault((date, workout_name), {})[muscle_group] = sets
     
     # Initialize results dictionary
     workout_types = {}
     
+    # Workout ids, formatting each distinct day once
+    workout_ids = format_dates(workouts['Date'], '%Y%m%d') + '_' + workouts['Workout Name'].astype(str)
+    
     # Process each workout
-    for _, row in workouts.iterrows():
-        date = row['Date']
-        workout_name = row['Workout Name']
-        workout_id = f"{date.strftime('%Y%m%d')}_{workout_name}"
-        
-        # Get exercises for this workout
-        workout_df = df[(df['Date'] == date) & (df['Workout Name'] == workout_name)]
+    for workout_id, date, workout_name in zip(workout_ids, workouts['Date'], workouts['Workout Name']):
+        key = (date, workout_name)
         
         # Count muscle groups in this workout
-        muscle_counts = workout_df.groupby('Muscle Group').size()
-        total_sets = len(workout_df)
+        muscle_counts = workout_muscle_sets.get(key, {})
+        total_sets = workout_sets.get(key, 0)
         
         # Calculate percentages
-        muscle_percentages = (muscle_counts / total_sets * 100).to_dict()
+        muscle_percentages = {muscle_group: sets / total_sets * 100 for muscle_group, sets in muscle_counts.items()}
         
         # Determine workout type based on muscle group composition
         if 'Chest' in muscle_percentages and muscle_percentages['Chest'] >= 50:
@@ -526,14 +846,14 @@ def segment_workouts_by_type(df):
             workout_type = 'Cardio Session'
         elif 'Olympic' in muscle_percentages and muscle_percentages['Olympic'] >= 30:
             workout_type = 'Olympic Lifting'
-        elif set(muscle_counts.index).intersection({'Chest', 'Shoulders', 'Triceps', 'Arms'}):
+        elif not PUSH_MUSCLE_GROUPS.isdisjoint(muscle_counts):
             # Push workout (chest, shoulders, triceps)
             push_pct = sum(muscle_percentages.get(m, 0) for m in ['Chest', 'Shoulders', 'Arms'])
             if push_pct >= 70:
                 workout_type = 'Push Workout'
             else:
                 workout_type = 'Upper Body'
-        elif set(muscle_counts.index).intersection({'Back', 'Biceps', 'Arms'}):
+        elif not PULL_MUSCLE_GROUPS.isdisjoint(muscle_counts):
             # Pull workout (back, biceps)
             pull_pct = sum(muscle_percentages.get(m, 0) for m in ['Back', 'Arms'])
             if pull_pct >= 70:
@@ -556,12 +876,88 @@ def segment_workouts_by_type(df):
             'workout_type': workout_type,
             'muscle_percentages': muscle_percentages,
             'total_sets': total_sets,
-            'total_volume': workout_df['Volume'].sum(),
-            'exercises': workout_df['Exercise Name'].unique().tolist()
+            'total_volume': volumes[workout_positions[key]].sum() if key in workout_positions else 0,
+            'exercises': list(workout_exercises.get(key, []))
         }
     
     return workout_types
 
+# Ratio thresholds for balance recommendations:
+# (ratio, 'above'/'below', threshold, high-severity threshold, issue, description, suggestion)
+BALANCE_RATIO_RULES = [
+    ('push_pull_ratio', 'above', 1.3, 1.6, 'Push/Pull Imbalance',
+     'Your push volume is significantly higher than your pull volume.',
+     'Consider adding more back exercises to balance your routine.'),
+    ('push_pull_ratio', 'below', 0.7, 0.4, 'Pull/Push Imbalance',
+     'Your pull volume is significantly higher than your push volume.',
+     'Consider adding more chest and shoulder exercises to balance your routine.'),
+    ('upper_lower_ratio', 'above', 2.0, 3.0, 'Upper/Lower Imbalance',
+     'Your upper body volume is much higher than your lower body volume.',
+     'Consider adding more leg exercises to achieve better balance.'),
+    ('upper_lower_ratio', 'below', 0.5, 0.3, 'Lower/Upper Imbalance',
+     'Your lower body volume is much higher than your upper body volume.',
+     'Consider adding more upper body exercises to achieve better balance.')
+]
+
+@lru_cache(maxsize=128)
+def _balance_recommendations(push_pull_ratio, upper_lower_ratio, muscle_percentage):
+    """
+    Derive balance recommendations from the balance ratios
+    
+    Parameters:
+    -----------
+    push_pull_ratio : float
+        Push volume divided by pull volume
+    upper_lower_ratio : float
+        Upper body volume divided by lower body volume
+    muscle_percentage : tuple
+        (muscle group, percentage of total volume) pairs
+        
+    Returns:
+    --------
+    tuple
+        Recommendation dicts (copy before modifying; results are cached)
+    """
+    ratios = {'push_pull_ratio': push_pull_ratio, 'upper_lower_ratio': upper_lower_ratio}
+    recommendations = []
+    
+    # Apply the ratio thresholds
+    for ratio_name, direction, threshold, high_threshold, issue, description, suggestion in BALANCE_RATIO_RULES:
+        ratio = ratios[ratio_name]
+        if direction == 'above':
+            triggered, high = ratio > threshold, ratio >= high_threshold
+        else:
+            triggered, high = ratio < threshold, ratio <= high_threshold
+        
+        if triggered:
+            recommendations.append({
+                'issue': issue,
+                'description': description,
+                'suggestion': suggestion,
+                'severity': 'high' if high else 'moderate'
+            })
+    
+    percentages = dict(muscle_percentage)
+    if 'Core' in percentages and percentages['Core'] < 5:
+        recommendations.append({
+            'issue': 'Low Core Training',
+            'description': 'Your core training volume is quite low.',
+            'suggestion': 'Consider adding more dedicated core exercises for overall stability and strength.',
+            'severity': 'low'
+        })
+    
+    # Check for underrepresented muscle groups
+    for muscle, percentage in muscle_percentage:
+        if muscle in {'Shoulders', 'Back', 'Legs'} and percentage < 10:
+            recommendations.append({
+                'issue': f'Low {muscle} Volume',
+                'description': f'Your {muscle.lower()} training volume appears to be low relative to other muscle groups.',
+                'suggestion': f'Consider adding more {muscle.lower()} exercises for balanced development.',
+                'severity': 'moderate'
+            })
+    
+    return tuple(recommendations)
+
 def calculate_workout_balance(df):
     """
     Calculate the balance between muscle groups
@@ -577,77 +973,36 @@ def calculate_workout_balance(df):
         Dictionary with balance metrics
     """
     # Calculate volume per muscle group
-    muscle_volume = df.groupby('Muscle Group')['Volume'].sum()
+    muscle_volume = df.groupby('Muscle Group', observed=True, sort=False)['Volume'].sum()
     
     # Calculate percentage for each muscle group
     total_volume = muscle_volume.sum()
     muscle_percentage = (muscle_volume / total_volume * 100).to_dict() if total_volume > 0 else {}
     
+    # Plain dict of group volumes for the scalar arithmetic below
+    volumes = dict(zip(muscle_volume.index, muscle_volume.to_numpy()))
+    arms = volumes.get('Arms', 0)
+    
     # Calculate imbalance metrics
-    push_muscles = muscle_volume.get('Chest', 0) + muscle_volume.get('Shoulders', 0) + muscle_volume.get('Arms', 0) * 0.6
-    pull_muscles = muscle_volume.get('Back', 0) + muscle_volume.get('Arms', 0) * 0.4
+    push_muscles = volumes.get('Chest', 0) + volumes.get('Shoulders', 0) + arms * 0.6
+    pull_muscles = volumes.get('Back', 0) + arms * 0.4
     
     push_pull_ratio = push_muscles / pull_muscles if pull_muscles > 0 else float('inf')
     
     upper_muscles = push_muscles + pull_muscles
-    lower_muscles = muscle_volume.get('Legs', 0)
+    lower_muscles = volumes.get('Legs', 0)
     
     upper_lower_ratio = upper_muscles / lower_muscles if lower_muscles > 0 else float('inf')
     
     # Calculate core vs. other balance
-    core_muscles = muscle_volume.get('Core', 0)
+    core_muscles = volumes.get('Core', 0)
     core_ratio = core_muscles / (total_volume - core_muscles) if (total_volume - core_muscles) > 0 else float('inf')
     
-    # Generate recommendations based on ratios
-    recommendations = []
-    
-    if push_pull_ratio > 1.3:
-        recommendations.append({
-            'issue': 'Push/Pull Imbalance',
-            'description': 'Your push volume is significantly higher than your pull volume.',
-            'suggestion': 'Consider adding more back exercises to balance your routine.',
-            'severity': 'moderate' if push_pull_ratio < 1.6 else 'high'
-        })
-    elif push_pull_ratio < 0.7:
-        recommendations.append({
-            'issue': 'Pull/Push Imbalance',
-            'description': 'Your pull volume is significantly higher than your push volume.',
-            'suggestion': 'Consider adding more chest and shoulder exercises to balance your routine.',
-            'severity': 'moderate' if push_pull_ratio > 0.4 else 'high'
-        })
-    
-    if upper_lower_ratio > 2.0:
-        recommendations.append({
-            'issue': 'Upper/Lower Imbalance',
-            'description': 'Your upper body volume is much higher than your lower body volume.',
-            'suggestion': 'Consider adding more leg exercises to achieve better balance.',
-            'severity': 'moderate' if upper_lower_ratio < 3.0 else 'high'
-        })
-    elif upper_lower_ratio < 0.5:
-        recommendations.append({
-            'issue': 'Lower/Upper Imbalance',
-            'description': 'Your lower body volume is much higher than your upper body volume.',
-            'suggestion': 'Consider adding more upper body exercises to achieve better balance.',
-            'severity': 'moderate' if upper_lower_ratio > 0.3 else 'high'
-        })
-    
-    if 'Core' in muscle_percentage and muscle_percentage['Core'] < 5:
-        recommendations.append({
-            'issue': 'Low Core Training',
-            'description': 'Your core training volume is quite low.',
-            'suggestion': 'Consider adding more dedicated core exercises for overall stability and strength.',
-            'severity': 'low'
-        })
-    
-    # Check for underrepresented muscle groups
-    for muscle, percentage in muscle_percentage.items():
-        if muscle in ['Shoulders', 'Back', 'Legs'] and percentage < 10:
-            recommendations.append({
-                'issue': f'Low {muscle} Volume',
-                'description': f'Your {muscle.lower()} training volume appears to be low relative to other muscle groups.',
-                'suggestion': f'Consider adding more {muscle.lower()} exercises for balanced development.',
-                'severity': 'moderate'
-            })
+    # Recommendations depend only on the ratios and percentages, so reuse them
+    recommendations = [
+        dict(recommendation) for recommendation in
+        _balance_recommendations(push_pull_ratio, upper_lower_ratio, tuple(muscle_percentage.items()))
+    ]
     
     return {
         'muscle_percentage': muscle_percentage,
@@ -674,59 +1029,49 @@ def filter_data_by_criteria(df, filters):
     pandas DataFrame
         Filtered DataFrame
     """
-    filtered_df = df.copy()
+    # Combine every criterion into one mask so the matching rows are copied once
+    mask = np.ones(len(df), dtype=bool)
     
     # Apply date range filter
     if 'start_date' in filters and 'end_date' in filters:
-        filtered_df = filtered_df[
-            (filtered_df['Date'].dt.date >= filters['start_date']) & 
-            (filtered_df['Date'].dt.date <= filters['end_date'])
-        ]
+        mask &= day_range_mask(df['Date'], filters['start_date'], filters['end_date'])
     
     # Apply muscle group filter
     if 'muscle_groups' in filters and filters['muscle_groups']:
-        filtered_df = filtered_df[filtered_df['Muscle Group'].isin(filters['muscle_groups'])]
+        mask &= df['Muscle Group'].isin(filters['muscle_groups']).to_numpy()
     
     # Apply exercise filter
     if 'exercises' in filters and filters['exercises']:
-        filtered_df = filtered_df[filtered_df['Exercise Name'].isin(filters['exercises'])]
+        mask &= df['Exercise Name'].isin(filters['exercises']).to_numpy()
     
     # Apply workout type filter
     if 'workout_types' in filters and filters['workout_types']:
         # This requires a more complex approach since workout types are calculated
         # Get workout IDs for the filtered types
         workout_types = segment_workouts_by_type(df)
+        selected_types = set(filters['workout_types'])
         filtered_workout_ids = [
             wid for wid, data in workout_types.items() 
-            if data['workout_type'] in filters['workout_types']
+            if data['workout_type'] in selected_types
         ]
         
         # Filter data
-        filtered_df = filtered_df[filtered_df['workout_id'].isin(filtered_workout_ids)]
-    
-    # Apply weight range filter
-    if 'min_weight' in filters and filters['min_weight'] is not None:
-        filtered_df = filtered_df[filtered_df['Weight (kg)'] >= filters['min_weight']]
-    
-    if 'max_weight' in filters and filters['max_weight'] is not None:
-        filtered_df = filtered_df[filtered_df['Weight (kg)'] <= filters['max_weight']]
-    
-    # Apply rep range filter
-    if 'min_reps' in filters and filters['min_reps'] is not None:
-        filtered_df = filtered_df[filtered_df['Reps'] >= filters['min_reps']]
-    
-    if 'max_reps' in filters and filters['max_reps'] is not None:
-        filtered_df = filtered_df[filtered_df['Reps'] <= filters['max_reps']]
-    
-    # Apply volume range filter
-    if 'min_volume' in filters and filters['min_volume'] is not None:
-        filtered_df = filtered_df[filtered_df['Volume'] >= filters['min_volume']]
-    
-    if 'max_volume' in filters and filters['max_volume'] is not None:
-        filtered_df = filtered_df[filtered_df['Volume'] <= filters['max_volume']]
+        mask &= df['workout_id'].isin(filtered_workout_ids).to_numpy()
+    
+    # Apply weight, rep and volume range filters
+    for column, min_key, max_key in (('Weight (kg)', 'min_weight', 'max_weight'),
+                                     ('Reps', 'min_reps', 'max_reps'),
+                                     ('Volume', 'min_volume', 'max_volume')):
+        if min_key in filters and filters[min_key] is not None:
+            mask &= (df[column] >= filters[min_key]).to_numpy()
+        
+        if max_key in filters and filters[max_key] is not None:
+            mask &= (df[column] <= filters[max_key]).to_numpy()
     
     # Apply PR filter
     if 'only_prs' in filters and filters['only_prs']:
-        filtered_df = filtered_df[filtered_df['Is Any PR']]
+        mask &= df['Is Any PR'].to_numpy(dtype=bool)
+    
+    filtered_df = df[mask]
     
     return filtered_df
\ No newline at end of file
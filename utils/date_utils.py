@@ -3,6 +3,11 @@
 
 import datetime as dt
 
+import numpy as np
+import pandas as pd
+
+from config.settings import MAX_CHART_POINTS
+
 def get_default_date_range(min_date, max_date):
     """
     Get a default date range for filtering
@@ -96,4 +101,170 @@ def get_period_label(period):
         'year': 'Yearly'
     }
     
-    return labels.get(period, period.capitalize())
\ No newline at end of file
+    return labels.get(period, period.capitalize())
+
+def format_dates(dates, fmt):
+    """
+    Format a datetime Series, running strftime once per distinct day
+    
+    Only valid for formats with day or coarser resolution (e.g. '%Y-%m',
+    '%Y-%U', '%A'), since times within a day are not distinguished.
+    
+    Parameters:
+    -----------
+    dates : pandas Series
+        datetime64 Series to format
+    fmt : str
+        strftime format string
+        
+    Returns:
+    --------
+    pandas Series
+        Formatted strings, aligned with the input index
+    """
+    days = dates.to_numpy(dtype='datetime64[D]')
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    labels = pd.DatetimeIndex(unique_days).strftime(fmt).to_numpy(dtype=object)
+    
+    return pd.Series(labels[inverse], index=dates.index, name=dates.name)
+
+def unique_days(dates):
+    """
+    Get the distinct calendar days in a datetime Series
+    
+    Parameters:
+    -----------
+    dates : pandas Series
+        datetime64 Series (duplicates and NaT allowed)
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Sorted datetime64[D] array of days, without NaT
+    """
+    days = np.unique(dates.to_numpy(dtype='datetime64[D]'))
+    return days[~np.isnat(days)]
+
+def day_range_mask(dates, start_date, end_date):
+    """
+    Flag the datetimes whose calendar day falls in an inclusive date range
+    
+    Parameters:
+    -----------
+    dates : pandas Series
+        datetime64 Series
+    start_date : datetime.date
+        First day to include
+    end_date : datetime.date
+        Last day to include
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean mask aligned with dates
+    """
+    days = dates.to_numpy(dtype='datetime64[D]')
+    return (days >= np.datetime64(start_date, 'D')) & (days <= np.datetime64(end_date, 'D'))
+
+def find_streaks(dates):
+    """
+    Find runs of consecutive workout days
+    
+    Parameters:
+    -----------
+    dates : pandas Series
+        datetime64 Series of workout dates (duplicates allowed)
+        
+    Returns:
+    --------
+    tuple
+        (starts, ends, lengths) arrays for every streak longer than one day,
+        in chronological order; starts and ends are datetime64[D]
+    """
+    days = unique_days(dates)
+    
+    # A new run starts wherever the gap to the previous day is not exactly one
+    gaps = np.diff(days).astype('int64')
+    breaks = np.concatenate(([0], np.flatnonzero(gaps != 1) + 1, [len(days)]))
+    lengths = np.diff(breaks)
+    
+    # Single days are not streaks
+    keep = lengths > 1
+    starts = days[breaks[:-1][keep]]
+    ends = days[breaks[1:][keep] - 1]
+    
+    return starts, ends, lengths[keep]
+
+def calendar_month_grids(dates, start_date, end_date):
+    """
+    Count events per day and lay each month out as a weekday x day grid
+    
+    Parameters:
+    -----------
+    dates : pandas Series
+        datetime64 Series with one entry per event (e.g. workout or PR)
+    start_date : datetime-like
+        First day of the calendar
+    end_date : datetime-like
+        Last day of the calendar
+        
+    Returns:
+    --------
+    list
+        (month, days, grid) per calendar month, where month is a datetime64[M],
+        days holds the day-of-month numbers covered and grid is a 7 x len(days)
+        array of counts (NaN rows for weekdays that do not occur in the range)
+    """
+    first = pd.Timestamp(start_date).to_datetime64().astype('datetime64[D]')
+    last = pd.Timestamp(end_date).to_datetime64().astype('datetime64[D]')
+    all_days = np.arange(first, last + 1)
+    
+    # Scatter event counts into one dense buffer covering the whole range
+    offsets = (dates.to_numpy(dtype='datetime64[D]') - first).astype('int64')
+    offsets = offsets[(offsets >= 0) & (offsets < len(all_days))]
+    counts = np.bincount(offsets, minlength=len(all_days)).astype(float)
+    
+    # Calendar coordinates (1970-01-01 was a Thursday, weekday 3)
+    weekdays = (all_days.astype('int64') + 3) % 7
+    months = all_days.astype('datetime64[M]')
+    day_of_month = (all_days - months).astype('int64') + 1
+    
+    # Days are contiguous, so each month is a slice of the buffer
+    month_starts, bounds = np.unique(months, return_index=True)
+    bounds = np.append(bounds, len(all_days))
+    
+    grids = []
+    for i, month in enumerate(month_starts):
+        month_slice = slice(bounds[i], bounds[i + 1])
+        month_days = day_of_month[month_slice]
+        
+        grid = np.zeros((7, len(month_days)))
+        grid[weekdays[month_slice], month_days - month_days[0]] = counts[month_slice]
+        grid[np.setdiff1d(np.arange(7), weekdays[month_slice])] = np.nan
+        
+        grids.append((month, month_days, grid))
+    
+    return grids
+
+def downsample_daily(df, max_points=MAX_CHART_POINTS):
+    """
+    Bucket a per-date series into weekly means when it is too long to plot usefully
+    
+    Parameters:
+    -----------
+    df : pandas DataFrame
+        Data with a 'Date' column and numeric value columns
+    max_points : int
+        Largest number of rows plotted as-is
+        
+    Returns:
+    --------
+    pandas DataFrame
+        df itself, or one row per week that has data
+    """
+    if len(df) <= max_points:
+        return df
+    
+    weekly = df.resample('W', on='Date').mean(numeric_only=True)
+    
+    return weekly.dropna(how='all').reset_index()
@@ -8,7 +8,17 @@ import pandas as pd
 import numpy as np
 import logging
 
-from config.settings import THEME, MUSCLE_GROUP_COLORS, COLOR_SCALES, PLOT_LAYOUT
+from config.settings import THEME, MUSCLE_GROUP_COLORS, COLOR_SCALES, PLOT_LAYOUT, WEEKDAY_NAMES
+from visualization.themes import GymVizTheme
+from data.processor import get_exercise_muscle_groups, get_exercise_rows
+from utils.date_utils import downsample_daily, format_dates
+
+# Numba is optional - fall back to plain NumPy when it is not installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -17,6 +27,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _linfit(y):
+    """
+    Closed-form least-squares line through y against its index
+    
+    Uses centred sums (accumulated in float64), which stay accurate for long
+    series where n * sum(x^2) - sum(x)^2 would cancel catastrophically.
+    
+    Parameters:
+    -----------
+    y : numpy.ndarray
+        float32 array of values
+        
+    Returns:
+    --------
+    tuple
+        (slope, intercept)
+    """
+    n = y.shape[0]
+    dx = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+    y_mean = y.astype(np.float64).mean()
+    sxx = (dx * dx).sum()
+    if sxx == 0:
+        return 0.0, y_mean
+    m = (dx * (y - y_mean)).sum() / sxx
+    b = y_mean - m * (n - 1) / 2.0
+    return m, b
+
+if NUMBA_AVAILABLE:
+    _linfit = njit(cache=True, fastmath=True)(_linfit)
+
+def _linear_trend(values):
+    """
+    Evaluate the linear trend line for a series of values
+    
+    Parameters:
+    -----------
+    values : pandas Series or array-like
+        Values ordered along the x axis
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Trend line values at each index
+    """
+    y = np.asarray(values, dtype=np.float32)
+    m, b = _linfit(y)
+    return m * np.arange(len(y), dtype=np.float32) + b
+
 def ensure_period_columns(df, period='month'):
     """
     Ensure that period columns (YearMonth, YearWeek) exist in the DataFrame
@@ -33,15 +91,19 @@ def ensure_period_columns(df, period='month'):
     pandas DataFrame
         DataFrame with period columns
     """
+    # Preprocessed data already has them
+    if all(col in df.columns for col in ['YearMonth', 'YearWeek', 'Year']):
+        return df
+    
     # Make a copy to avoid modifying the original
     result_df = df.copy()
     
-    # Create period columns if they don't exist
+    # Create period columns if they don't exist, formatting each day once
     if 'YearMonth' not in result_df.columns:
-        result_df['YearMonth'] = result_df['Date'].dt.strftime('%Y-%m')
+        result_df['YearMonth'] = format_dates(result_df['Date'], '%Y-%m')
     
     if 'YearWeek' not in result_df.columns:
-        result_df['YearWeek'] = result_df['Date'].dt.strftime('%Y-%U')
+        result_df['YearWeek'] = format_dates(result_df['Date'], '%Y-%U')
     
     if 'Year' not in result_df.columns:
         result_df['Year'] = result_df['Date'].dt.year
@@ -80,18 +142,18 @@ def create_top_exercises_chart(df, metric='frequency', n=10, muscle_group=None):
     
     # Create chart based on metric
     if metric == 'frequency':
-        # Count occurrences of each exercise
-        exercise_counts = filtered_df['Exercise Name'].value_counts().reset_index()
-        exercise_counts.columns = ['Exercise', 'Count']
-        
-        # Take top n
-        top_exercises = exercise_counts.head(n)
+        # Count occurrences of each exercise and take the top n (partial sort)
+        top_exercises = (
+            filtered_df.groupby('Exercise Name', observed=True, sort=False).size()
+            .nlargest(n)
+            .rename_axis('Exercise')
+            .reset_index(name='Count')
+        )
         
         # Get muscle group for color
-        top_exercises['Muscle Group'] = top_exercises['Exercise'].apply(
-            lambda x: filtered_df[filtered_df['Exercise Name'] == x]['Muscle Group'].iloc[0]
-            if len(filtered_df[filtered_df['Exercise Name'] == x]) > 0 else 'Other'
-        )
+        top_exercises['Muscle Group'] = top_exercises['Exercise'].map(
+            get_exercise_muscle_groups(filtered_df)
+        ).fillna('Other')
         
         # Create bar chart
         fig = px.bar(
@@ -121,20 +183,19 @@ def create_top_exercises_chart(df, metric='frequency', n=10, muscle_group=None):
             plot_bgcolor='rgba(0,0,0,0)',
             font=dict(color='white')
         )
-        
+    
     elif metric == 'volume':
         # Calculate total volume for each exercise
-        exercise_volume = filtered_df.groupby('Exercise Name')['Volume'].sum().reset_index()
+        exercise_volume = filtered_df.groupby('Exercise Name', observed=True, sort=False, as_index=False)['Volume'].sum()
         exercise_volume.columns = ['Exercise', 'Volume']
         
         # Take top n
         top_exercises = exercise_volume.sort_values('Volume', ascending=False).head(n)
         
         # Get muscle group for color
-        top_exercises['Muscle Group'] = top_exercises['Exercise'].apply(
-            lambda x: filtered_df[filtered_df['Exercise Name'] == x]['Muscle Group'].iloc[0]
-            if len(filtered_df[filtered_df['Exercise Name'] == x]) > 0 else 'Other'
-        )
+        top_exercises['Muscle Group'] = top_exercises['Exercise'].map(
+            get_exercise_muscle_groups(filtered_df)
+        ).fillna('Other')
         
         # Create bar chart
         fig = px.bar(
@@ -167,17 +228,16 @@ def create_top_exercises_chart(df, metric='frequency', n=10, muscle_group=None):
     
     elif metric == 'weight':
         # Find maximum weight for each exercise
-        exercise_max_weight = filtered_df.groupby('Exercise Name')['Weight (kg)'].max().reset_index()
+        exercise_max_weight = filtered_df.groupby('Exercise Name', observed=True, sort=False, as_index=False)['Weight (kg)'].max()
         exercise_max_weight.columns = ['Exercise', 'Max Weight']
         
         # Take top n
         top_exercises = exercise_max_weight.sort_values('Max Weight', ascending=False).head(n)
         
         # Get muscle group for color
-        top_exercises['Muscle Group'] = top_exercises['Exercise'].apply(
-            lambda x: filtered_df[filtered_df['Exercise Name'] == x]['Muscle Group'].iloc[0]
-            if len(filtered_df[filtered_df['Exercise Name'] == x]) > 0 else 'Other'
-        )
+        top_exercises['Muscle Group'] = top_exercises['Exercise'].map(
+            get_exercise_muscle_groups(filtered_df)
+        ).fillna('Other')
         
         # Create bar chart
         fig = px.bar(
@@ -212,17 +272,16 @@ def create_top_exercises_chart(df, metric='frequency', n=10, muscle_group=None):
         # Check if RPE data is available
         if 'RPE' in filtered_df.columns and not filtered_df['RPE'].isna().all():
             # Calculate average RPE for each exercise
-            exercise_intensity = filtered_df.groupby('Exercise Name')['RPE'].mean().reset_index()
+            exercise_intensity = filtered_df.groupby('Exercise Name', observed=True, sort=False, as_index=False)['RPE'].mean()
             exercise_intensity.columns = ['Exercise', 'Avg RPE']
             
             # Take top n
             top_exercises = exercise_intensity.sort_values('Avg RPE', ascending=False).head(n)
             
             # Get muscle group for color
-            top_exercises['Muscle Group'] = top_exercises['Exercise'].apply(
-                lambda x: filtered_df[filtered_df['Exercise Name'] == x]['Muscle Group'].iloc[0]
-                if len(filtered_df[filtered_df['Exercise Name'] == x]) > 0 else 'Other'
-            )
+            top_exercises['Muscle Group'] = top_exercises['Exercise'].map(
+                get_exercise_muscle_groups(filtered_df)
+            ).fillna('Other')
             
             # Create bar chart
             fig = px.bar(
@@ -281,17 +340,17 @@ def create_exercise_progression_chart(df, exercise_name):
         Exercise progression chart
     """
     # Filter for the specified exercise
-    exercise_df = df[df['Exercise Name'] == exercise_name].copy()
+    exercise_df = get_exercise_rows(df, exercise_name, ['Date', 'Weight (kg)', 'Volume', 'Reps'])
     
     if exercise_df.empty:
         return None
     
-    # Group by date
-    grouped = exercise_df.groupby('Date').agg({
+    # Group by date (weekly averages for very long histories)
+    grouped = downsample_daily(exercise_df.groupby('Date', as_index=False).agg({
         'Weight (kg)': 'max',
         'Volume': 'sum',
         'Reps': 'max'
-    }).reset_index()
+    }))
     
     # Create the figure with subplots
     fig = make_subplots(
@@ -354,12 +413,10 @@ def create_exercise_progression_chart(df, exercise_name):
     # Add trend lines
     if len(grouped) > 2:
         # Weight trend
-        z = np.polyfit(range(len(grouped)), grouped['Weight (kg)'], 1)
-        p = np.poly1d(z)
         fig.add_trace(
             go.Scatter(
                 x=grouped['Date'],
-                y=p(range(len(grouped))),
+                y=_linear_trend(grouped['Weight (kg)']),
                 mode='lines',
                 name='Weight Trend',
                 line=dict(color=THEME['primary'], dash='dash', width=1)
@@ -368,12 +425,10 @@ def create_exercise_progression_chart(df, exercise_name):
         )
         
         # Volume trend
-        z = np.polyfit(range(len(grouped)), grouped['Volume'], 1)
-        p = np.poly1d(z)
         fig.add_trace(
             go.Scatter(
                 x=grouped['Date'],
-                y=p(range(len(grouped))),
+                y=_linear_trend(grouped['Volume']),
                 mode='lines',
                 name='Volume Trend',
                 line=dict(color=THEME['secondary'], dash='dash', width=1)
@@ -382,12 +437,10 @@ def create_exercise_progression_chart(df, exercise_name):
         )
         
         # Reps trend
-        z = np.polyfit(range(len(grouped)), grouped['Reps'], 1)
-        p = np.poly1d(z)
         fig.add_trace(
             go.Scatter(
                 x=grouped['Date'],
-                y=p(range(len(grouped))),
+                y=_linear_trend(grouped['Reps']),
                 mode='lines',
                 name='Reps Trend',
                 line=dict(color=THEME['accent'], dash='dash', width=1)
@@ -423,7 +476,7 @@ def create_exercise_progression_chart(df, exercise_name):
         hovertemplate='%{y}<extra></extra>'
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_exercise_variety_chart(df, period='month'):
     """
@@ -453,20 +506,14 @@ def create_exercise_variety_chart(df, period='month'):
         period_col = 'YearMonth'
     
     # Count unique exercises per period
-    variety = df.groupby(period_col)['Exercise Name'].nunique().reset_index()
+    variety = df.groupby(period_col, as_index=False)['Exercise Name'].nunique()
     variety.columns = [period_col, 'Unique Exercises']
     
-    # Calculate cumulative variety (total unique exercises up to each period)
-    cum_variety = []
-    seen_exercises = set()
-    
-    for _, row in variety.iterrows():
-        period = row[period_col]
-        period_exercises = set(df[df[period_col] == period]['Exercise Name'].unique())
-        seen_exercises.update(period_exercises)
-        cum_variety.append(len(seen_exercises))
-    
-    variety['Cumulative Unique Exercises'] = cum_variety
+    # Calculate cumulative variety (total unique exercises up to each period):
+    # count each exercise once, in the period it first appears
+    first_periods = df.groupby('Exercise Name', observed=True)[period_col].min()
+    new_exercises = first_periods.value_counts().reindex(variety[period_col], fill_value=0)
+    variety['Cumulative Unique Exercises'] = new_exercises.cumsum().to_numpy()
     
     # Create figure with two y-axes
     fig = make_subplots(specs=[[{"secondary_y": True}]])
@@ -544,11 +591,11 @@ def create_exercise_distribution_chart(df, by='muscle_group'):
     """
     if by == 'muscle_group':
         # Group by muscle group
-        distribution = df.groupby('Muscle Group').agg({
-            'Exercise Name': lambda x: len(x.unique()),
+        distribution = df.groupby('Muscle Group', observed=True, as_index=False).agg({
+            'Exercise Name': 'nunique',
             'Volume': 'sum',
             '_id': 'count'  # Assuming _id is a unique identifier for sets
-        }).reset_index()
+        })
         
         distribution.columns = ['Muscle Group', 'Exercise Count', 'Volume', 'Set Count']
         
@@ -570,11 +617,11 @@ def create_exercise_distribution_chart(df, by='muscle_group'):
     
     elif by == 'workout':
         # Group by workout name
-        distribution = df.groupby('Workout Name').agg({
-            'Exercise Name': lambda x: len(x.unique()),
+        distribution = df.groupby('Workout Name', observed=True, sort=False, as_index=False).agg({
+            'Exercise Name': 'nunique',
             'Volume': 'sum',
             '_id': 'count'  # Assuming _id is a unique identifier for sets
-        }).reset_index()
+        })
         
         distribution.columns = ['Workout Name', 'Exercise Count', 'Volume', 'Set Count']
         
@@ -598,18 +645,17 @@ def create_exercise_distribution_chart(df, by='muscle_group'):
         )
     
     elif by == 'day':
-        # Group by day of week
-        df['Day'] = df['Date'].dt.day_name()
+        # Group by day of week (reuse the precomputed Weekday column when present)
+        day_names = df['Weekday'] if 'Weekday' in df.columns else df['Date'].dt.day_name()
         
         # Sort days of week correctly
-        days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        df['Day'] = pd.Categorical(df['Day'], categories=days_order, ordered=True)
+        day = pd.Categorical(day_names, categories=WEEKDAY_NAMES, ordered=True)
         
-        distribution = df.groupby('Day').agg({
-            'Exercise Name': lambda x: len(x.unique()),
+        distribution = df.groupby(day, observed=True).agg({
+            'Exercise Name': 'nunique',
             'Volume': 'sum',
             '_id': 'count',  # Assuming _id is a unique identifier for sets
-            'Workout Name': lambda x: len(x.unique())
+            'Workout Name': 'nunique'
         }).reset_index()
         
         distribution.columns = ['Day', 'Exercise Count', 'Volume', 'Set Count', 'Workout Count']
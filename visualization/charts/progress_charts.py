@@ -6,9 +6,11 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-import datetime as dt
 
 from config.settings import THEME, MUSCLE_GROUP_COLORS, COLOR_SCALES, PLOT_LAYOUT
+from visualization.themes import GymVizTheme
+from data.processor import get_exercise_rows, get_first_last_sets, get_pr_mask, rolling_mean
+from utils.date_utils import calendar_month_grids
 
 def create_pr_frequency_chart(df, period='month'):
     """
@@ -23,15 +25,15 @@ def create_pr_frequency_chart(df, period='month'):
         
     Returns:
     --------
-    plotly.graph_objects.Figure
-        PR frequency chart
+    tuple
+        (PR frequency chart, total number of PRs); the chart is None if the
+        data has no PR columns
     """
     # Check if PR columns exist
-    pr_columns = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR', 'Is Any PR']
-    available_pr_columns = [col for col in pr_columns if col in df.columns]
+    pr_mask = get_pr_mask(df)
     
-    if not available_pr_columns:
-        return None
+    if pr_mask is None:
+        return None, 0
     
     # Define the period column
     if period == 'week':
@@ -41,15 +43,9 @@ def create_pr_frequency_chart(df, period='month'):
     else:  # Default to month
         period_col = 'YearMonth'
     
-    # Create PR DataFrame
-    pr_df = df.copy()
-    
-    # If 'Is Any PR' doesn't exist but other PR columns do, create it
-    if 'Is Any PR' not in available_pr_columns and available_pr_columns:
-        pr_df['Is Any PR'] = pr_df[available_pr_columns].any(axis=1)
-    
-    # Group by period and count PRs
-    pr_counts = pr_df[pr_df['Is Any PR']].groupby(period_col).size().reset_index(name='PR Count')
+    # Group the PR sets by period and count them, gathering only the period column
+    pr_counts = df.loc[pr_mask, [period_col]].groupby(period_col).size().reset_index(name='PR Count')
+    pr_count = int(pr_counts['PR Count'].to_numpy().sum())
     
     # Create bar chart
     fig = px.bar(
@@ -69,9 +65,9 @@ def create_pr_frequency_chart(df, period='month'):
         coloraxis_showscale=False
     )
     
-    return fig
+    return fig, pr_count
 
-def create_volume_progression_chart(df, period='month'):
+def create_volume_progression_chart(df, period='month', color=None):
     """
     Create a chart showing volume progression over time
     
@@ -81,6 +77,8 @@ def create_volume_progression_chart(df, period='month'):
         DataFrame with workout data
     period : str
         Aggregation period ('week', 'month', or 'year')
+    color : str, optional
+        Bar color (defaults to the theme primary color)
         
     Returns:
     --------
@@ -96,10 +94,10 @@ def create_volume_progression_chart(df, period='month'):
         period_col = 'YearMonth'
     
     # Group by period and calculate total volume
-    volume_by_period = df.groupby(period_col)['Volume'].sum().reset_index()
+    volume_by_period = df.groupby(period_col, as_index=False)['Volume'].sum()
     
     # Calculate rolling average (3-period)
-    volume_by_period['Rolling Average'] = volume_by_period['Volume'].rolling(window=3, min_periods=1).mean()
+    volume_by_period['Rolling Average'] = rolling_mean(volume_by_period['Volume'], window=3)
     
     # Create figure with two traces
     fig = go.Figure()
@@ -109,7 +107,7 @@ def create_volume_progression_chart(df, period='month'):
         x=volume_by_period[period_col],
         y=volume_by_period['Volume'],
         name='Volume',
-        marker_color=THEME['primary']
+        marker_color=color if color else THEME['primary']
     ))
     
     # Add rolling average line
@@ -138,7 +136,7 @@ def create_volume_progression_chart(df, period='month'):
         hovermode='x unified'
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_strength_progression_chart(df, exercise_name=None, metric='weight', period='month'):
     """
@@ -162,9 +160,9 @@ def create_strength_progression_chart(df, exercise_name=None, metric='weight', p
     """
     # Filter data if needed
     if exercise_name:
-        filtered_df = df[df['Exercise Name'] == exercise_name].copy()
+        filtered_df = get_exercise_rows(df, exercise_name)
     else:
-        filtered_df = df.copy()
+        filtered_df = df
     
     # Return None if no data
     if filtered_df.empty:
@@ -192,13 +190,13 @@ def create_strength_progression_chart(df, exercise_name=None, metric='weight', p
     # Group by period
     if exercise_name:
         # For a specific exercise
-        grouped = filtered_df.groupby(period_col)[metric_col].mean().reset_index()
+        grouped = filtered_df.groupby(period_col, as_index=False)[metric_col].mean()
     else:
         # For all exercises
-        grouped = filtered_df.groupby(period_col)[metric_col].mean().reset_index()
+        grouped = filtered_df.groupby(period_col, as_index=False)[metric_col].mean()
     
     # Calculate rolling average (3-period)
-    grouped['Rolling Average'] = grouped[metric_col].rolling(window=3, min_periods=1).mean()
+    grouped['Rolling Average'] = rolling_mean(grouped[metric_col], window=3)
     
     # Calculate percent change
     grouped['Percent Change'] = grouped[metric_col].pct_change() * 100
@@ -237,15 +235,18 @@ def create_strength_progression_chart(df, exercise_name=None, metric='weight', p
         row=1, col=1
     )
     
-    # Add trace for percent change
+    # Add trace for percent change (bars colored by sign in one vectorized pass)
+    percent_change = grouped['Percent Change'].to_numpy()
     fig.add_trace(
         go.Bar(
             x=grouped[period_col],
             y=grouped['Percent Change'],
             name='Percent Change',
             marker=dict(
-                color=grouped['Percent Change'].apply(
-                    lambda x: THEME['success'] if x > 0 else THEME['error'] if x < 0 else THEME['secondary']
+                color=np.select(
+                    [percent_change > 0, percent_change < 0],
+                    [THEME['success'], THEME['error']],
+                    THEME['secondary']
                 )
             )
         ),
@@ -284,7 +285,7 @@ def create_strength_progression_chart(df, exercise_name=None, metric='weight', p
     fig.update_yaxes(title_text=metric_label, row=1, col=1)
     fig.update_yaxes(title_text="% Change", row=2, col=1)
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_muscle_group_progress_chart(df, period='month'):
     """
@@ -313,27 +314,27 @@ def create_muscle_group_progress_chart(df, period='month'):
     else:  # Default to month
         period_col = 'YearMonth'
     
-    # Calculate volume by muscle group and period
-    muscle_volume = df.groupby([period_col, 'Muscle Group'])['Volume'].sum().reset_index()
-    
-    # Pivot the data
-    pivot_muscle = muscle_volume.pivot(index=period_col, columns='Muscle Group', values='Volume').reset_index()
-    pivot_muscle = pivot_muscle.fillna(0)
-    
-    # Create line chart
-    fig = go.Figure()
+    # Calculate volume by muscle group and period (one row per muscle group)
+    pivot_muscle = (
+        df.groupby(['Muscle Group', period_col], observed=True)['Volume']
+        .sum()
+        .unstack(fill_value=0)
+    )
+    periods = pivot_muscle.columns.to_numpy()
+    colors = [MUSCLE_GROUP_COLORS.get(muscle, '#7C7C7C') for muscle in pivot_muscle.index]
     
-    # Add a trace for each muscle group
-    for muscle in df['Muscle Group'].unique():
-        if muscle in pivot_muscle.columns:
-            fig.add_trace(go.Scatter(
-                x=pivot_muscle[period_col],
-                y=pivot_muscle[muscle],
-                mode='lines+markers',
-                name=muscle,
-                line=dict(color=MUSCLE_GROUP_COLORS.get(muscle, '#7C7C7C'), width=2),
-                marker=dict(size=8, color=MUSCLE_GROUP_COLORS.get(muscle, '#7C7C7C'))
-            ))
+    # Create one line chart with a trace per muscle group, built in a single pass
+    fig = go.Figure(data=[
+        go.Scatter(
+            x=periods,
+            y=volumes,
+            mode='lines+markers',
+            name=muscle,
+            line=dict(color=color, width=2),
+            marker=dict(size=8, color=color)
+        )
+        for muscle, volumes, color in zip(pivot_muscle.index, pivot_muscle.to_numpy(), colors)
+    ])
     
     # Update layout
     fig.update_layout(
@@ -351,7 +352,7 @@ def create_muscle_group_progress_chart(df, period='month'):
         hovermode='x unified'
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_pr_calendar(df):
     """
@@ -368,55 +369,19 @@ def create_pr_calendar(df):
         PR calendar heatmap
     """
     # Check if PR columns exist
-    pr_columns = ['Is Weight PR', 'Is Reps PR', 'Is Volume PR', 'Is 1RM PR', 'Is Any PR']
-    available_pr_columns = [col for col in pr_columns if col in df.columns]
+    pr_mask = get_pr_mask(df)
     
-    if not available_pr_columns:
+    if pr_mask is None:
         return None
     
-    # Create PR DataFrame
-    pr_df = df.copy()
-    
-    # If 'Is Any PR' doesn't exist but other PR columns do, create it
-    if 'Is Any PR' not in available_pr_columns and available_pr_columns:
-        pr_df['Is Any PR'] = pr_df[available_pr_columns].any(axis=1)
-    
     # Keep only rows with PRs
-    pr_df = pr_df[pr_df['Is Any PR']]
-    
-    # Count PRs by date
-    pr_counts = pr_df.groupby(pr_df['Date'].dt.date).size().reset_index(name='PR Count')
-    
-    # Create calendar DataFrame
-    start_date = df['Date'].min().date()
-    end_date = df['Date'].max().date()
-    date_range = pd.date_range(start=start_date, end=end_date)
-    
-    calendar_df = pd.DataFrame({'Date': date_range})
-    calendar_df['Date'] = calendar_df['Date'].dt.date
-    calendar_df['Day'] = calendar_df['Date'].apply(lambda x: x.day)
-    calendar_df['Month'] = calendar_df['Date'].apply(lambda x: x.month)
-    calendar_df['Year'] = calendar_df['Date'].apply(lambda x: x.year)
-    calendar_df['Weekday'] = calendar_df['Date'].apply(lambda x: x.weekday())
-    
-    # Merge with PR counts
-    calendar_df = pd.merge(calendar_df, pr_counts, on='Date', how='left')
-    calendar_df['PR Count'] = calendar_df['PR Count'].fillna(0)
-    
-    # Create a pivot table for the heatmap
-    heatmap_data = calendar_df.pivot_table(
-        index='Weekday', 
-        columns=['Year', 'Month', 'Day'], 
-        values='PR Count',
-        aggfunc='sum'
-    ).fillna(0)
-    
-    # Get unique months in the data
-    months = sorted(calendar_df[['Year', 'Month']].drop_duplicates().itertuples(index=False), 
-                   key=lambda x: (x.Year, x.Month))
+    pr_df = df[pr_mask]
+    
+    # Count PRs per calendar day, laid out month by month
+    month_grids = calendar_month_grids(pr_df['Date'], df['Date'].min(), df['Date'].max())
     
     # Create a subplot for each month
-    n_months = len(months)
+    n_months = len(month_grids)
     n_cols = min(4, n_months)  # Maximum 4 columns
     n_rows = (n_months + n_cols - 1) // n_cols
     
@@ -424,35 +389,21 @@ def create_pr_calendar(df):
     fig = make_subplots(
         rows=n_rows, 
         cols=n_cols, 
-        subplot_titles=[f"{dt.datetime(month.Year, month.Month, 1).strftime('%b %Y')}" for month in months],
+        subplot_titles=[pd.Timestamp(month).strftime('%b %Y') for month, _, _ in month_grids],
         vertical_spacing=0.05,
         horizontal_spacing=0.05
     )
     
     # Create a heatmap for each month
-    for i, (year, month) in enumerate([(m.Year, m.Month) for m in months]):
-        # Filter data for this month
-        month_data = calendar_df[(calendar_df['Year'] == year) & (calendar_df['Month'] == month)]
-        
-        # Create a pivot table for this month
-        month_pivot = month_data.pivot_table(
-            index='Weekday', 
-            columns='Day', 
-            values='PR Count', 
-            aggfunc='sum'
-        ).fillna(0)
-        
-        # Reindex to ensure all days of the week are present
-        month_pivot = month_pivot.reindex(index=range(7))
-        
+    for i, (_, days, grid) in enumerate(month_grids):
         # Calculate row and column for subplot
         row = i // n_cols + 1
         col = i % n_cols + 1
         
         # Create heatmap
         heatmap = go.Heatmap(
-            z=month_pivot.values,
-            x=month_pivot.columns,
+            z=grid,
+            x=days,
             y=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
             colorscale=COLOR_SCALES['heatmap'],
             showscale=i == 0,  # Only show color scale for the first month
@@ -500,45 +451,36 @@ def create_top_progress_chart(df, metric='weight', top_n=5):
         metric_col = 'Weight (kg)'
         metric_label = 'Weight'
     
-    # Get exercises that appear at least twice
-    exercise_counts = df.groupby('Exercise Name').size()
-    valid_exercises = exercise_counts[exercise_counts >= 2].index
-    
-    # Calculate progress for each exercise
-    progress_data = []
-    
-    for exercise in valid_exercises:
-        ex_df = df[df['Exercise Name'] == exercise].copy()
-        
-        # Sort by date
-        ex_df = ex_df.sort_values('Date')
-        
-        # Get first and last workout
-        first = ex_df.iloc[0]
-        last = ex_df.iloc[-1]
-        
-        # Calculate percent change
-        if first[metric_col] > 0:
-            pct_change = ((last[metric_col] - first[metric_col]) / first[metric_col]) * 100
-        else:
-            pct_change = 0
-        
-        # Calculate date range
-        days_diff = (last['Date'] - first['Date']).days
-        
-        progress_data.append({
-            'Exercise': exercise,
-            'Muscle Group': ex_df['Muscle Group'].iloc[0] if 'Muscle Group' in ex_df.columns else 'Unknown',
-            'Percent Change': pct_change,
-            'Start Value': first[metric_col],
-            'End Value': last[metric_col],
-            'Start Date': first['Date'],
-            'End Date': last['Date'],
-            'Days': days_diff
-        })
-    
-    # Convert to DataFrame
-    progress_df = pd.DataFrame(progress_data)
+    # First and last set of every exercise, in exercise name order
+    first, last, counts = get_first_last_sets(df)
+    order = first.index.sort_values()
+    first, last, counts = first.loc[order], last.loc[order], counts.loc[order]
+    
+    # Keep exercises that appear at least twice
+    valid = (counts >= 2).to_numpy()
+    first, last = first[valid], last[valid]
+    
+    # Calculate percent change (0 when the starting value is not positive)
+    start_values = first[metric_col].to_numpy()
+    end_values = last[metric_col].to_numpy()
+    pct_change = np.divide(
+        end_values - start_values, start_values,
+        out=np.zeros_like(start_values), where=start_values > 0
+    ).astype(float) * 100
+    
+    # Muscle group of each exercise is taken from its first set
+    muscle_groups = first['Muscle Group'].to_numpy() if 'Muscle Group' in first.columns else 'Unknown'
+    
+    progress_df = pd.DataFrame({
+        'Exercise': first.index.to_numpy(),
+        'Muscle Group': muscle_groups,
+        'Percent Change': pct_change,
+        'Start Value': start_values,
+        'End Value': end_values,
+        'Start Date': first['Date'].to_numpy(),
+        'End Date': last['Date'].to_numpy(),
+        'Days': (last['Date'] - first['Date']).dt.days.to_numpy()
+    })
     
     # Sort by percent change and take top N
     top_progress = progress_df.sort_values('Percent Change', ascending=False).head(top_n)
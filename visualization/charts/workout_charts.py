@@ -6,9 +6,13 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-import datetime as dt
 import logging
 
+from config.settings import COLOR_SCALES, WEEKDAY_NAMES
+from utils.date_utils import calendar_month_grids, find_streaks, format_dates, unique_days
+from data.processor import calculate_density, get_unique_workouts, rolling_mean
+from visualization.themes import GymVizTheme
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,24 +34,28 @@ def ensure_period_columns(df, period='month'):
     Returns:
     --------
     pandas DataFrame
-        DataFrame with period columns
+        DataFrame with period columns (the input itself if nothing was missing)
     """
+    # Preprocessed data already has them, so return it as-is
+    if all(col in df.columns for col in ['YearMonth', 'YearWeek', 'Year']):
+        return df
+    
     # Make a copy to avoid modifying the original
     result_df = df.copy()
     
-    # Create period columns if they don't exist
+    # Create period columns if they don't exist, formatting each day once
     if 'YearMonth' not in result_df.columns:
-        result_df['YearMonth'] = result_df['Date'].dt.strftime('%Y-%m')
+        result_df['YearMonth'] = format_dates(result_df['Date'], '%Y-%m')
     
     if 'YearWeek' not in result_df.columns:
-        result_df['YearWeek'] = result_df['Date'].dt.strftime('%Y-%U')
+        result_df['YearWeek'] = format_dates(result_df['Date'], '%Y-%U')
     
     if 'Year' not in result_df.columns:
         result_df['Year'] = result_df['Date'].dt.year
     
     return result_df
 
-def create_workouts_heatmap(df, year=None):
+def create_workouts_heatmap(df, year=None, colorscale=None):
     """
     Create a calendar heatmap of workouts
     
@@ -57,6 +65,8 @@ def create_workouts_heatmap(df, year=None):
         DataFrame with workout data
     year : int, optional
         Year to filter for
+    colorscale : list or str, optional
+        Heatmap color scale (defaults to the theme heatmap scale)
         
     Returns:
     --------
@@ -66,34 +76,23 @@ def create_workouts_heatmap(df, year=None):
     # Create a copy of the DataFrame to avoid modifying the original
     plot_df = df.copy()
     
+    # Resolve the color scale once, at construction time
+    if colorscale is None:
+        colorscale = COLOR_SCALES['heatmap']
+    
     # Filter for the specified year if provided
     if year is not None:
         plot_df = plot_df[plot_df['Date'].dt.year == year]
     
-    # Create a DataFrame with all dates in the range
-    start_date = plot_df['Date'].min()
-    end_date = plot_df['Date'].max()
-    
-    # Create a date range DataFrame
-    all_dates = pd.DataFrame({'Date': pd.date_range(start=start_date, end=end_date)})
-    all_dates['Year'] = all_dates['Date'].dt.year
-    all_dates['Month'] = all_dates['Date'].dt.month
-    all_dates['Day'] = all_dates['Date'].dt.day
-    all_dates['Weekday'] = all_dates['Date'].dt.dayofweek
-    
-    # Group by date and count workouts
-    workout_counts = plot_df.drop_duplicates(subset=['Date', 'Workout Name']).groupby('Date').size().reset_index(name='Workouts')
-    
-    # Merge with all dates
-    calendar_df = all_dates.merge(workout_counts, on='Date', how='left')
-    calendar_df['Workouts'] = calendar_df['Workouts'].fillna(0)
-    
-    # Get unique months in the data
-    months = sorted(calendar_df[['Year', 'Month']].drop_duplicates().itertuples(index=False), 
-                   key=lambda x: (x.Year, x.Month))
+    # Count workouts per calendar day, laid out month by month
+    month_grids = calendar_month_grids(
+        get_unique_workouts(plot_df)['Date'],
+        plot_df['Date'].min(),
+        plot_df['Date'].max()
+    )
     
     # Create a subplot for each month
-    n_months = len(months)
+    n_months = len(month_grids)
     n_cols = min(4, n_months)  # Maximum 4 columns
     n_rows = (n_months + n_cols - 1) // n_cols
     
@@ -101,37 +100,23 @@ def create_workouts_heatmap(df, year=None):
     fig = make_subplots(
         rows=n_rows, 
         cols=n_cols, 
-        subplot_titles=[f"{dt.datetime(month.Year, month.Month, 1).strftime('%b %Y')}" for month in months],
+        subplot_titles=[pd.Timestamp(month).strftime('%b %Y') for month, _, _ in month_grids],
         vertical_spacing=0.05,
         horizontal_spacing=0.05
     )
     
     # Create a heatmap for each month
-    for i, (year, month) in enumerate([(m.Year, m.Month) for m in months]):
-        # Filter data for this month
-        month_data = calendar_df[(calendar_df['Year'] == year) & (calendar_df['Month'] == month)]
-        
-        # Create a pivot table for this month
-        month_pivot = month_data.pivot_table(
-            index='Weekday', 
-            columns='Day', 
-            values='Workouts', 
-            aggfunc='sum'
-        ).fillna(0)
-        
-        # Reindex to ensure all days of the week are present
-        month_pivot = month_pivot.reindex(index=range(7))
-        
+    for i, (_, days, grid) in enumerate(month_grids):
         # Calculate row and column for subplot
         row = i // n_cols + 1
         col = i % n_cols + 1
         
         # Create heatmap
         heatmap = go.Heatmap(
-            z=month_pivot.values,
-            x=month_pivot.columns,
+            z=grid,
+            x=days,
             y=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-            colorscale='YlGnBu',
+            colorscale=colorscale,
             showscale=i == 0,  # Only show color scale for the first month
             colorbar=dict(title='Workouts')
         )
@@ -148,7 +133,7 @@ def create_workouts_heatmap(df, year=None):
         font=dict(color='white')
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_workout_duration_chart(df, period='month'):
     """
@@ -182,14 +167,14 @@ def create_workout_duration_chart(df, period='month'):
         period_col = 'YearMonth'
     
     # Group by date and workout name to get unique workouts
-    workouts = df.drop_duplicates(subset=['Date', 'Workout Name'])
+    workouts = get_unique_workouts(df)
     
     # Convert duration to minutes if not already done
     if 'Duration (min)' not in workouts.columns:
-        workouts['Duration (min)'] = workouts['Duration (sec)'] / 60
+        workouts = workouts.assign(**{'Duration (min)': workouts['Duration (sec)'] / 60})
     
     # Group by period
-    grouped = workouts.groupby(period_col)['Duration (min)'].mean().reset_index()
+    grouped = workouts.groupby(period_col, as_index=False)['Duration (min)'].mean()
     
     # Create line chart
     fig = go.Figure()
@@ -206,7 +191,7 @@ def create_workout_duration_chart(df, period='month'):
     
     # Add rolling average if enough data
     if len(grouped) > 3:
-        grouped['Rolling Avg'] = grouped['Duration (min)'].rolling(window=3, min_periods=1).mean()
+        grouped['Rolling Avg'] = rolling_mean(grouped['Duration (min)'], window=3)
         
         fig.add_trace(go.Scatter(
             x=grouped[period_col],
@@ -234,7 +219,7 @@ def create_workout_duration_chart(df, period='month'):
         font=dict(color='white')
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_rest_days_analysis(df):
     """
@@ -250,20 +235,15 @@ def create_rest_days_analysis(df):
     tuple
         (rest_days_histogram, rest_days_trend) or (None, None)
     """
-    # Get unique workout dates
-    workout_dates = sorted(df['Date'].dt.date.unique())
+    # Get unique workout days (sorted, without NaT)
+    workout_dates = unique_days(df['Date'])
     
     if len(workout_dates) <= 1:
         return None, None
     
-    # Calculate days between workouts
-    rest_days = []
-    dates = []
-    
-    for i in range(1, len(workout_dates)):
-        days_diff = (workout_dates[i] - workout_dates[i-1]).days - 1
-        rest_days.append(days_diff)
-        dates.append(workout_dates[i])
+    # Calculate days between consecutive workouts, attributed to the later workout
+    rest_days = (np.diff(workout_dates) // np.timedelta64(1, 'D')) - 1
+    dates = workout_dates[1:]
     
     # Create histogram of rest days
     rest_df = pd.DataFrame({'Rest Days': rest_days})
@@ -273,7 +253,7 @@ def create_rest_days_analysis(df):
         x='Rest Days',
         title='Distribution of Rest Days Between Workouts',
         color_discrete_sequence=['#4361EE'],
-        nbins=min(20, max(5, max(rest_days) + 1))
+        nbins=min(20, max(5, int(rest_days.max()) + 1))
     )
     
     rest_hist.update_layout(
@@ -287,16 +267,13 @@ def create_rest_days_analysis(df):
     
     # Calculate average rest days per month
     if len(dates) > 0:
-        month_data = []
-        
-        for i, date in enumerate(dates):
-            month = date.strftime('%Y-%m')
-            days_diff = rest_days[i]
-            month_data.append((month, days_diff))
+        month_df = pd.DataFrame({
+            'Month': np.datetime_as_string(dates, unit='M'),
+            'Rest Days': rest_days
+        })
         
-        if month_data:
-            month_df = pd.DataFrame(month_data, columns=['Month', 'Rest Days'])
-            monthly_avg = month_df.groupby('Month')['Rest Days'].mean().reset_index()
+        if not month_df.empty:
+            monthly_avg = month_df.groupby('Month', as_index=False)['Rest Days'].mean()
             
             rest_trend = px.line(
                 monthly_avg,
@@ -352,24 +329,24 @@ def create_workout_metrics_over_time(df, metric='volume', period='month'):
     # Calculate metric for each workout
     if metric == 'volume':
         # Group by date and workout name, then calculate total volume
-        workout_metrics = df.groupby(['Date', 'Workout Name'])['Volume'].sum().reset_index()
+        workout_metrics = df.groupby(['Date', 'Workout Name'], observed=True, sort=False, as_index=False)['Volume'].sum()
         
         # Group by period
-        grouped = workout_metrics.groupby(['Date', period_col])['Volume'].mean().reset_index()
-        grouped = grouped.groupby(period_col)['Volume'].mean().reset_index()
+        grouped = workout_metrics.groupby(['Date', period_col], as_index=False)['Volume'].mean()
+        grouped = grouped.groupby(period_col, as_index=False)['Volume'].mean()
         
         y_title = 'Average Volume per Workout (kg×reps)'
         title = f'Average Workout Volume per {period.capitalize()}'
         color = '#4361EE'
-        
+    
     elif metric == 'intensity':
         if 'RPE' in df.columns and not df['RPE'].isna().all():
             # Group by date and workout name, then calculate average RPE
-            workout_metrics = df.groupby(['Date', 'Workout Name'])['RPE'].mean().reset_index()
+            workout_metrics = df.groupby(['Date', 'Workout Name'], observed=True, sort=False, as_index=False)['RPE'].mean()
             
             # Group by period
-            grouped = workout_metrics.groupby(['Date', period_col])['RPE'].mean().reset_index()
-            grouped = grouped.groupby(period_col)['RPE'].mean().reset_index()
+            grouped = workout_metrics.groupby(['Date', period_col], as_index=False)['RPE'].mean()
+            grouped = grouped.groupby(period_col, as_index=False)['RPE'].mean()
             
             y_title = 'Average RPE'
             title = f'Average Workout Intensity (RPE) per {period.capitalize()}'
@@ -380,20 +357,17 @@ def create_workout_metrics_over_time(df, metric='volume', period='month'):
     elif metric == 'density':
         if 'Duration (sec)' in df.columns and not df['Duration (sec)'].isna().all():
             # Group by date and workout name, then calculate volume and duration
-            workout_metrics = df.groupby(['Date', 'Workout Name']).agg({
+            workout_metrics = df.groupby(['Date', 'Workout Name'], observed=True, sort=False, as_index=False).agg({
                 'Volume': 'sum',
                 'Duration (sec)': 'first'
-            }).reset_index()
+            })
             
             # Calculate density (volume per minute)
-            workout_metrics['Density'] = workout_metrics.apply(
-                lambda row: row['Volume'] / (row['Duration (sec)'] / 60) if row['Duration (sec)'] > 0 else 0,
-                axis=1
-            )
+            workout_metrics['Density'] = calculate_density(workout_metrics['Volume'], workout_metrics['Duration (sec)'])
             
             # Group by period
-            grouped = workout_metrics.groupby(['Date', period_col])['Density'].mean().reset_index()
-            grouped = grouped.groupby(period_col)['Density'].mean().reset_index()
+            grouped = workout_metrics.groupby(['Date', period_col], as_index=False)['Density'].mean()
+            grouped = grouped.groupby(period_col, as_index=False)['Density'].mean()
             
             y_title = 'Average Density (Volume per Minute)'
             title = f'Average Workout Density per {period.capitalize()}'
@@ -419,7 +393,7 @@ def create_workout_metrics_over_time(df, metric='volume', period='month'):
     
     # Add rolling average if enough data
     if len(grouped) > 5:
-        grouped['Rolling Avg'] = grouped[metric if metric != 'volume' else 'Volume'].rolling(window=3, min_periods=1).mean()
+        grouped['Rolling Avg'] = rolling_mean(grouped[metric if metric != 'volume' else 'Volume'], window=3)
         
         fig.add_trace(go.Scatter(
             x=grouped[period_col],
@@ -447,7 +421,7 @@ def create_workout_metrics_over_time(df, metric='volume', period='month'):
         font=dict(color='white')
     )
     
-    return fig
+    return GymVizTheme.optimize_traces(fig)
 
 def create_workout_frequency_chart(df, period='month'):
     """
@@ -477,7 +451,7 @@ def create_workout_frequency_chart(df, period='month'):
         period_col = 'YearMonth'
     
     # Get unique workouts
-    workouts = df.drop_duplicates(subset=['Date', 'Workout Name'])
+    workouts = get_unique_workouts(df)
     
     # Count workouts by period
     workout_counts = workouts.groupby(period_col).size().reset_index(name='Count')
@@ -549,16 +523,15 @@ def create_workout_distribution_chart(df):
         Workout distribution chart
     """
     # Get unique workouts
-    workouts = df.drop_duplicates(subset=['Date', 'Workout Name'])
-    
-    # Count workouts by day of week
-    day_counts = workouts['Weekday'].value_counts().reset_index()
-    day_counts.columns = ['Day', 'Count']
-    
-    # Reorder days
-    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_counts['Day'] = pd.Categorical(day_counts['Day'], categories=days_order, ordered=True)
-    day_counts = day_counts.sort_values('Day')
+    workouts = get_unique_workouts(df)
+    
+    # Count workouts by day of week, in calendar order
+    day_counts = (
+        workouts['Weekday'].value_counts(sort=False)
+        .reindex(WEEKDAY_NAMES, fill_value=0)
+        .rename_axis('Day')
+        .reset_index(name='Count')
+    )
     
     # Calculate percentages
     total_workouts = day_counts['Count'].sum()
@@ -607,43 +580,20 @@ def create_workout_streak_chart(df):
     plotly.graph_objects.Figure
         Workout streak chart
     """
-    # Get unique workout dates
-    workout_dates = sorted(df['Date'].dt.date.unique())
-    
-    if len(workout_dates) <= 1:
-        return None
-    
     # Calculate streaks
-    streaks = []
-    current_streak = [workout_dates[0]]
-    
-    for i in range(1, len(workout_dates)):
-        if (workout_dates[i] - workout_dates[i-1]).days == 1:
-            current_streak.append(workout_dates[i])
-        else:
-            if len(current_streak) > 1:
-                streaks.append({
-                    'start': current_streak[0],
-                    'end': current_streak[-1],
-                    'length': len(current_streak)
-                })
-            current_streak = [workout_dates[i]]
-    
-    # Add the last streak
-    if len(current_streak) > 1:
-        streaks.append({
-            'start': current_streak[0],
-            'end': current_streak[-1],
-            'length': len(current_streak)
-        })
+    starts, ends, lengths = find_streaks(df['Date'])
     
     # If no streaks, return None
-    if not streaks:
+    if len(lengths) == 0:
         return None
     
     # Convert to DataFrame
-    streak_df = pd.DataFrame(streaks)
-    streak_df['mid_date'] = streak_df.apply(lambda row: row['start'] + (row['end'] - row['start']) / 2, axis=1)
+    streak_df = pd.DataFrame({
+        'start': starts.astype(object),
+        'end': ends.astype(object),
+        'length': lengths
+    })
+    streak_df['mid_date'] = (starts + (ends - starts) // 2).astype(object)
     
     # Sort by length
     streak_df = streak_df.sort_values('length', ascending=False)
@@ -693,17 +643,16 @@ def create_workout_volume_by_day_chart(df):
         Workout volume by day chart
     """
     # Group by date and calculate total volume
-    volume_by_date = df.groupby('Date')['Volume'].sum().reset_index()
+    volume_by_date = df.groupby('Date', as_index=False)['Volume'].sum()
     
-    # Add day of week
-    volume_by_date['Day'] = volume_by_date['Date'].dt.day_name()
+    # Add day of week from the weekday codes (no per-date name formatting)
+    volume_by_date['Day'] = pd.Categorical.from_codes(volume_by_date['Date'].dt.dayofweek, categories=WEEKDAY_NAMES)
     
     # Calculate average volume by day
-    day_avg_volume = volume_by_date.groupby('Day')['Volume'].mean().reset_index()
+    day_avg_volume = volume_by_date.groupby('Day', observed=True, sort=False, as_index=False)['Volume'].mean()
     
     # Reorder days
-    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_avg_volume['Day'] = pd.Categorical(day_avg_volume['Day'], categories=days_order, ordered=True)
+    day_avg_volume['Day'] = pd.Categorical(day_avg_volume['Day'], categories=WEEKDAY_NAMES, ordered=True)
     day_avg_volume = day_avg_volume.sort_values('Day')
     
     # Create bar chart
@@ -1,12 +1,13 @@
 # gymviz/visualization/themes.py
 # Theme management and styling for GymViz visualizations
 
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import streamlit as st
 
-from config.settings import THEME, MUSCLE_GROUP_COLORS, COLOR_SCALES, PLOT_LAYOUT
+from config.settings import THEME, MUSCLE_GROUP_COLORS, COLOR_SCALES, PLOT_LAYOUT, MAX_CHART_POINTS
 
 class GymVizTheme:
     """
@@ -261,15 +262,15 @@ class GymVizTheme:
         # Line chart specific styling
         color = accent_color if accent_color else THEME['primary']
         
-        for trace in fig.data:
-            if trace.mode and 'lines' in trace.mode:
-                # Only modify traces that are lines
-                trace.line.color = color
-                if 'markers' in trace.mode:
-                    trace.marker.color = color
-                    trace.marker.size = 8
-                    trace.marker.line.width = 2
-                    trace.marker.line.color = THEME['background']
+        # Only modify traces that are lines, in a single update per property group
+        fig.update_traces(
+            line_color=color,
+            selector=lambda trace: 'lines' in (getattr(trace, 'mode', None) or '')
+        )
+        fig.update_traces(
+            marker=dict(color=color, size=8, line=dict(width=2, color=THEME['background'])),
+            selector=lambda trace: 'lines' in (getattr(trace, 'mode', None) or '') and 'markers' in trace.mode
+        )
         
         return fig
     
@@ -326,23 +327,24 @@ class GymVizTheme:
         fig = GymVizTheme.apply_chart_theme(fig)
         
         # Heatmap specific styling
-        for trace in fig.data:
-            if isinstance(trace, go.Heatmap):
-                trace.colorscale = COLOR_SCALES['heatmap']
-                trace.showscale = True
-                trace.colorbar = dict(
-                    thickness=15,
-                    len=0.7,
-                    tickfont=dict(
-                        size=10,
-                    ),
-                    title=dict(
-                        text='Count',
-                        font=dict(
-                            size=12,
-                        )
+        fig.update_traces(
+            colorscale=COLOR_SCALES['heatmap'],
+            showscale=True,
+            colorbar=dict(
+                thickness=15,
+                len=0.7,
+                tickfont=dict(
+                    size=10,
+                ),
+                title=dict(
+                    text='Count',
+                    font=dict(
+                        size=12,
                     )
                 )
+            ),
+            selector=dict(type='heatmap')
+        )
         
         return fig
     
@@ -365,24 +367,22 @@ class GymVizTheme:
         fig = GymVizTheme.apply_chart_theme(fig)
         
         # Pie chart specific styling
-        for trace in fig.data:
-            if isinstance(trace, go.Pie):
-                trace.textposition = 'inside'
-                trace.textinfo = 'percent+label'
-                trace.textfont.size = 12
-                trace.textfont.color = THEME['text']['light']
-                trace.hoverinfo = 'label+percent+value'
-                trace.hole = 0.4
-                
-                # Add muscle group colors if applicable
-                if hasattr(trace, 'labels'):
-                    muscle_colors = []
-                    for label in trace.labels:
-                        if label in MUSCLE_GROUP_COLORS:
-                            muscle_colors.append(MUSCLE_GROUP_COLORS[label])
-                        else:
-                            muscle_colors.append(MUSCLE_GROUP_COLORS['Other'])
-                    trace.marker.colors = muscle_colors
+        fig.update_traces(
+            textposition='inside',
+            textinfo='percent+label',
+            textfont=dict(size=12, color=THEME['text']['light']),
+            hoverinfo='label+percent+value',
+            hole=0.4,
+            selector=dict(type='pie')
+        )
+        
+        # Add muscle group colors if applicable
+        for trace in fig.select_traces(selector=dict(type='pie')):
+            if trace.labels is not None:
+                trace.marker.colors = [
+                    MUSCLE_GROUP_COLORS.get(label, MUSCLE_GROUP_COLORS['Other'])
+                    for label in trace.labels
+                ]
         
         return fig
     
@@ -409,20 +409,141 @@ class GymVizTheme:
         fig = GymVizTheme.apply_chart_theme(fig)
         
         # Scatter plot specific styling
-        for trace in fig.data:
-            if isinstance(trace, go.Scatter):
-                trace.marker.size = 10
-                trace.marker.line.width = 1
-                trace.marker.line.color = THEME['background']
-                
-                # If this is a scatter with muscle groups, apply muscle group colors
-                if color_var == 'Muscle Group':
-                    if hasattr(trace, 'marker') and hasattr(trace.marker, 'color'):
-                        if trace.marker.color in MUSCLE_GROUP_COLORS:
-                            trace.marker.color = MUSCLE_GROUP_COLORS[trace.marker.color]
+        fig.update_traces(
+            marker=dict(size=10, line=dict(width=1, color=THEME['background'])),
+            selector=dict(type='scatter')
+        )
+        
+        # If this is a scatter with muscle groups, apply muscle group colors
+        if color_var == 'Muscle Group':
+            for trace in fig.select_traces(selector=dict(type='scatter')):
+                if trace.marker.color in MUSCLE_GROUP_COLORS:
+                    trace.marker.color = MUSCLE_GROUP_COLORS[trace.marker.color]
         
         return fig
     
+    @staticmethod
+    def downsample_traces(fig, max_points=MAX_CHART_POINTS):
+        """
+        Thin long Scatter/Scattergl traces to the minimum and maximum of each x bucket
+        
+        Keeping both extremes per bucket preserves peaks and dips (PRs,
+        deloads) while bounding how many points are serialized to the browser.
+        
+        Parameters:
+        -----------
+        fig : plotly.graph_objects.Figure
+            Figure to downsample
+        max_points : int
+            Largest number of points kept per trace
+            
+        Returns:
+        --------
+        plotly.graph_objects.Figure
+            Figure with numeric scatter traces longer than max_points thinned
+        """
+        if fig is None:
+            return fig
+        
+        traces = []
+        downsampled = False
+        
+        for trace in fig.data:
+            y = np.asarray(trace.y) if isinstance(trace, (go.Scatter, go.Scattergl)) and trace.y is not None else None
+            
+            if y is None or len(y) <= max_points or not np.issubdtype(y.dtype, np.number):
+                traces.append(trace)
+                continue
+            
+            # Bucket the points along x and keep each bucket's lowest and highest y
+            n = len(y)
+            buckets = max(max_points // 2 - 1, 1)
+            bucket_ids = np.arange(n) * buckets // n
+            order = np.lexsort((y, bucket_ids))
+            starts = np.flatnonzero(np.r_[True, np.diff(bucket_ids[order]) != 0])
+            ends = np.r_[starts[1:], n] - 1
+            keep = np.unique(np.r_[0, order[starts], order[ends], n - 1])
+            
+            # Rebuild the trace with every per-point array cut to the kept points
+            props = _take_points(trace.to_plotly_json(), keep, n)
+            props.pop('type', None)
+            traces.append(type(trace)(props))
+            downsampled = True
+        
+        if not downsampled:
+            return fig
+        
+        return go.Figure(data=traces, layout=fig.layout)
+    
+    @staticmethod
+    def to_webgl(fig, threshold=1000):
+        """
+        Swap long SVG traces for their WebGL equivalents
+        
+        Parameters:
+        -----------
+        fig : plotly.graph_objects.Figure
+            Figure to convert
+        threshold : int
+            Minimum number of points before a trace is converted
+            
+        Returns:
+        --------
+        plotly.graph_objects.Figure
+            Figure with Scatter/Heatmap traces above the threshold rendered via WebGL
+        """
+        if fig is None:
+            return fig
+        
+        traces = []
+        converted = False
+        
+        for trace in fig.data:
+            gl_class = None
+            
+            if isinstance(trace, go.Scatter) and trace.x is not None and len(trace.x) > threshold:
+                gl_class = go.Scattergl
+            elif (isinstance(trace, go.Heatmap) and hasattr(go, 'Heatmapgl')
+                  and trace.z is not None and sum(len(row) for row in trace.z) > threshold):
+                gl_class = go.Heatmapgl
+            
+            if gl_class is None:
+                traces.append(trace)
+                continue
+            
+            # Rebuild the trace, dropping properties the WebGL type does not support
+            props = trace.to_plotly_json()
+            props.pop('type', None)
+            traces.append(gl_class(props, skip_invalid=True))
+            converted = True
+        
+        if not converted:
+            return fig
+        
+        return go.Figure(data=traces, layout=fig.layout)
+    
+    @staticmethod
+    def optimize_traces(fig):
+        """
+        Prepare a figure with long traces for the browser
+        
+        Traces long enough to matter are switched to WebGL first (judged on
+        their full length) and then thinned to MAX_CHART_POINTS. Short charts
+        stay SVG, so the dashboard does not use up the browser's limited
+        number of WebGL contexts.
+        
+        Parameters:
+        -----------
+        fig : plotly.graph_objects.Figure
+            Figure to optimize
+            
+        Returns:
+        --------
+        plotly.graph_objects.Figure
+            Optimized figure
+        """
+        return GymVizTheme.downsample_traces(GymVizTheme.to_webgl(fig))
+    
     @staticmethod
     def create_metric_card(label, value, delta=None, suffix="", help_text=None):
         """
@@ -486,6 +607,18 @@ class GymVizTheme:
         
         return container
 
+def _take_points(props, keep, n):
+    """Helper function to cut the length-n arrays of a trace's properties to the kept indices"""
+    taken = {}
+    for key, value in props.items():
+        if isinstance(value, dict):
+            taken[key] = _take_points(value, keep, n)
+        elif isinstance(value, (list, tuple, np.ndarray)) and len(value) == n:
+            taken[key] = np.asarray(value)[keep]
+        else:
+            taken[key] = value
+    return taken
+
 def _get_delta_class(delta):
     """Helper function to determine delta styling class"""
     if delta is None: